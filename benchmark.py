@@ -4,16 +4,28 @@ WhisperX Performance Benchmark Tool
 Compare different compute types, batch sizes, and model configurations.
 """
 
+import gc
 import os
+import re
 import sys
 import time
 import json
+import wave
+import bisect
 import argparse
+import subprocess
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 
+import numpy as np
 import whisperx
 import torch
 from rich.console import Console
@@ -24,6 +36,27 @@ from rich.text import Text
 
 console = Console()
 
+# Approximate bytes per weight for each compute type (CTranslate2 ships float16 weights)
+WEIGHT_BYTES = {
+    "float32": 4.0,
+    "float16": 2.0,
+    "bfloat16": 2.0,
+    "int8_float32": 1.0,
+    "int8_float16": 1.0,
+    "int8_bfloat16": 1.0,
+    "int8": 1.0,
+}
+
+# whisper.cpp reports timings on stderr, e.g. "whisper_print_timings:    load time =   512.34 ms"
+WHISPER_CPP_TIMING_RE = re.compile(r"whisper_print_timings:\s+(\w+) time =\s+([\d.]+) ms")
+
+# Warn when less than this fraction of GPU memory is free between trials
+MIN_FREE_GPU_FRACTION = 0.2
+
+# Realtime-factor bands for the speed column; a factor equal to a threshold ranks up
+_SPEED_THRESHOLDS = [1, 2, 5, 10]
+_SPEED_EMOJI = ["🐌", "🚶", "🏃", "⚡", "🚀"]
+
 @dataclass
 class BenchmarkResult:
     """Store benchmark results for a single configuration."""
@@ -40,20 +73,83 @@ class BenchmarkResult:
     memory_peak: Optional[float] = None
     segments_count: int = 0
     words_count: int = 0
+    model_size_mb: Optional[float] = None
+    model_load_time: Optional[float] = None
+    ttft: Optional[float] = None
+    decode_throughput_tokens_per_s: Optional[float] = None
+    thread_count: Optional[int] = None
+    align_backend: str = "eager"
+    align_bucket_size: int = 1
 
 class PerformanceBenchmark:
     """Benchmark different WhisperX configurations."""
     
-    def __init__(self, audio_path: str, output_dir: str = "./benchmark_results"):
+    def __init__(
+        self,
+        audio_path: str,
+        output_dir: str = "./benchmark_results",
+        whisper_cpp: Optional[str] = None,
+        whisper_cpp_model: Optional[str] = None,
+        compile_align: bool = False,
+        align_bucket_size: int = 8,
+        verbose: bool = False,
+        shared_audio: Optional[Tuple[str, int]] = None
+    ):
         self.audio_path = Path(audio_path)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.results: List[BenchmarkResult] = []
         
+        # whisperx progress output inside the timed region is opt-in
+        self.verbose = verbose
+        
+        # CTranslate2 has no int4 kernels; the int4 arm runs through whisper.cpp instead
+        self.whisper_cpp = whisper_cpp
+        self.whisper_cpp_model = Path(whisper_cpp_model) if whisper_cpp_model else None
+        self._wav_path: Optional[Path] = None
+        
+        # Optionally run the wav2vec2 alignment model through torch.compile
+        self.compile_align = compile_align
+        self.align_backend = "compiled" if compile_align else "eager"
+        
+        # Segments per batched wav2vec2 forward pass; 1 runs stock whisperx.align
+        self.align_bucket_size = max(1, align_bucket_size)
+        
+        # Loaded models are reused across trials so load time isn't paid per config
+        self._whisper_cache: Dict[Tuple, Any] = {}
+        self._align_cache: Dict[Tuple, Tuple] = {}
+        self._load_times: Dict[Tuple, float] = {}
+        
+        # Worker processes attach to the parent's buffer instead of decoding again
+        if shared_audio is not None:
+            shm_name, n_samples = shared_audio
+            self._shm = shared_memory.SharedMemory(name=shm_name)
+            self._owns_shm = False
+            self.audio = np.ndarray((n_samples,), dtype=np.float32, buffer=self._shm.buf)
+            self.duration = n_samples / 16000
+            self._host_registered = False
+            return
+        
         # Load audio once for all tests
         console.print("📁 Loading audio file for benchmarking...")
-        self.audio = whisperx.load_audio(str(audio_path))
-        self.duration = len(self.audio) / 16000
+        audio = whisperx.load_audio(str(audio_path))
+        self.duration = len(audio) / 16000
+        
+        # Keep the samples in shared memory so worker processes can alias them
+        self._shm = shared_memory.SharedMemory(create=True, size=audio.nbytes)
+        self._owns_shm = True
+        self.audio = np.ndarray(audio.shape, dtype=audio.dtype, buffer=self._shm.buf)
+        self.audio[:] = audio
+        del audio
+        
+        # Pin the buffer on CUDA so host-to-device copies skip the staging copy
+        self._host_registered = False
+        if torch.cuda.is_available():
+            try:
+                err = torch.cuda.cudart().cudaHostRegister(self.audio.ctypes.data, self.audio.nbytes, 0)
+                self._host_registered = int(err) == 0
+            except (RuntimeError, AttributeError):
+                pass
         
         console.print(f"📊 Audio duration: {self.duration:.1f}s ({self.duration/60:.1f}min)")
         console.print(f"📁 Results will be saved to: {self.output_dir}")
@@ -64,63 +160,87 @@ class PerformanceBenchmark:
         batch_size: int, 
         model: str = "large-v3",
         device: str = "cpu",
-        language: str = "sv"
+        language: str = "sv",
+        thread_count: int = 4
     ) -> BenchmarkResult:
         """Benchmark a single configuration."""
         
-        console.print(f"\n🔥 Testing: {compute_type} | batch={batch_size} | {device.upper()}")
+        console.print(f"\n🔥 Testing: {compute_type} | batch={batch_size} | threads={thread_count} | {device.upper()}")
+        
+        # torch's intra-op pool (VAD, alignment) can be resized at runtime; CTranslate2
+        # gets threads= at load time (see _get_whisper_model). OMP_NUM_THREADS is only
+        # read when OpenMP starts, long before this, so it isn't touched here
+        if device == "cpu":
+            torch.set_num_threads(thread_count)
+        elif device == "cuda":
+            # Let torch-side models (VAD, alignment) use TF32 and autotuned cuDNN kernels
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.backends.cudnn.benchmark = True
         
         total_start = time.time()
         
         try:
-            # Load model
-            console.print("🤖 Loading model...")
-            model_start = time.time()
-            whisper_model = whisperx.load_model(model, device, compute_type=compute_type, language=language)
-            model_load_time = time.time() - model_start
-            
             # Track memory usage if CUDA
             initial_memory = None
             peak_memory = None
-            if device == "cuda" and torch.cuda.is_available():
-                torch.cuda.reset_peak_memory_stats()
-                initial_memory = torch.cuda.memory_allocated() / 1024**2  # MB
+            model_load_time = None
+            ttft = None
+            decode_throughput = None
             
-            # Transcribe
-            console.print("🎯 Transcribing...")
-            transcribe_start = time.time()
-            result = whisper_model.transcribe(
-                self.audio, 
-                batch_size=batch_size,
-                language=language,
-                print_progress=True,
-                combined_progress=True
-            )
-            transcribe_time = time.time() - transcribe_start
+            if compute_type == "int4":
+                # Transcribe via whisper.cpp (timing parsed from its own report)
+                console.print("🎯 Transcribing with whisper.cpp (int4)...")
+                result, transcribe_time = self._transcribe_whisper_cpp(language, thread_count)
+                model_size_mb = self.whisper_cpp_model.stat().st_size / 1024**2
+            else:
+                # Load model (cached per model/device/compute type)
+                whisper_model = self._get_whisper_model(model, device, compute_type, language, thread_count)
+                model_load_time = self._load_times[(model, device, compute_type, language, thread_count)]
+                model_size_mb = self._estimate_model_size_mb(model, compute_type)
+                
+                # Untimed warm-up so CUDA init and cuDNN autotuning stay out of the timing
+                if device == "cuda":
+                    console.print("🔥 Warming up...")
+                    whisper_model.transcribe(
+                        self.audio[:16000 * 5],
+                        batch_size=batch_size,
+                        language=language
+                    )
+                
+                # Transcribe
+                console.print("🎯 Transcribing...")
+                if device == "cuda" and torch.cuda.is_available():
+                    torch.cuda.reset_peak_memory_stats()
+                    initial_memory = torch.cuda.memory_allocated() / 1024**2  # MB
+                transcribe_start = time.time()
+                result, segment_times, segment_texts = self._transcribe_with_timings(
+                    whisper_model, batch_size, language
+                )
+                transcribe_time = time.time() - transcribe_start
+                token_counts = self._count_tokens(whisper_model, segment_texts)
+                
+                # First segment out ≈ VAD + first encoder pass; after that it's mostly decoding
+                if segment_times:
+                    ttft = segment_times[0] - transcribe_start
+                    decode_span = segment_times[-1] - segment_times[0]
+                    if decode_span > 0:
+                        decode_throughput = sum(token_counts[1:]) / decode_span
             
             # Check memory peak
             if device == "cuda" and torch.cuda.is_available():
                 peak_memory = torch.cuda.max_memory_allocated() / 1024**2  # MB
             
-            # Load alignment model
-            console.print("🔗 Loading alignment...")
-            align_start = time.time()
-            alignment_model_name = "KBLab/wav2vec2-base-voxpopuli-sv-swedish" if language == "sv" else "WAV2VEC2_ASR_LARGE_LV60K_960H"
-            model_a, metadata = whisperx.load_align_model(
-                language_code=language, 
-                device=device,
-                model_name=alignment_model_name
-            )
+            # Load alignment model (cached per language/device)
+            model_a, metadata = self._get_align_model(language, device)
+            
+            # Untimed warm-up on one segment (triggers graph capture when compiled)
+            if result["segments"]:
+                self._align(result["segments"][:self.align_bucket_size], model_a, metadata, device)
             
             # Align
-            result = whisperx.align(
-                result["segments"], 
-                model_a, 
-                metadata, 
-                self.audio, 
-                device, 
-                return_char_alignments=False
-            )
+            align_start = time.time()
+            result = self._align(result["segments"], model_a, metadata, device)
             align_time = time.time() - align_start
             
             total_time = time.time() - total_start
@@ -143,18 +263,20 @@ class PerformanceBenchmark:
                 realtime_factor=realtime_factor,
                 memory_peak=peak_memory,
                 segments_count=segments_count,
-                words_count=words_count
+                words_count=words_count,
+                model_size_mb=model_size_mb,
+                model_load_time=model_load_time,
+                ttft=ttft,
+                decode_throughput_tokens_per_s=decode_throughput,
+                thread_count=thread_count,
+                align_backend=self.align_backend,
+                align_bucket_size=self.align_bucket_size
             )
             
             console.print(f"[green]✅ Complete: {realtime_factor:.1f}x realtime[/green]")
             if peak_memory:
                 console.print(f"[blue]💾 Peak GPU memory: {peak_memory:.0f}MB[/blue]")
             
-            # Clean up GPU memory
-            if device == "cuda":
-                del whisper_model, model_a
-                torch.cuda.empty_cache()
-            
             return benchmark_result
             
         except Exception as e:
@@ -172,55 +294,481 @@ class PerformanceBenchmark:
                 realtime_factor=0,
                 memory_peak=None,
                 segments_count=0,
-                words_count=0
+                words_count=0,
+                thread_count=thread_count,
+                align_backend=self.align_backend,
+                align_bucket_size=self.align_bucket_size
+            )
+    
+    def _transcribe_with_timings(self, whisper_model, batch_size: int, language: str) -> Tuple[Dict, List[float], List[Any]]:
+        """Transcribe while recording when each segment leaves the pipeline.
+        
+        FasterWhisperPipeline.transcribe iterates self.__call__ over the VAD
+        chunks, so an instance-level wrapper sees every segment as it streams
+        out without changing whisperx. Only the timestamp and raw text are kept
+        inside the timed region; see _count_tokens. Returns (result,
+        timestamps, texts).
+        """
+        segment_times: List[float] = []
+        segment_texts: List[Any] = []
+        pipeline_call = whisper_model.__call__
+        
+        def timed_call(*args, **kwargs):
+            for out in pipeline_call(*args, **kwargs):
+                segment_times.append(time.time())
+                segment_texts.append(out["text"] if isinstance(out, dict) else "")
+                yield out
+        
+        # Without progress output, print a heartbeat dot from a side thread instead
+        done = threading.Event()
+        dots = []
+        if not self.verbose:
+            def heartbeat():
+                while not done.wait(10):
+                    dots.append(1)
+                    console.print(".", end="")
+            threading.Thread(target=heartbeat, daemon=True).start()
+        
+        whisper_model.__call__ = timed_call
+        try:
+            result = whisper_model.transcribe(
+                self.audio, 
+                batch_size=batch_size,
+                language=language,
+                print_progress=self.verbose,
+                combined_progress=self.verbose
+            )
+        finally:
+            done.set()
+            del whisper_model.__call__
+        if dots:
+            console.print()
+        return result, segment_times, segment_texts
+    
+    @staticmethod
+    def _count_tokens(whisper_model, texts: List[Any]) -> List[int]:
+        """Token count per segment, once transcription's timing is done.
+        
+        With batch_size=1 whisperx yields each segment's text as a one-item
+        list, so lists are unwrapped first.
+        """
+        tokenizer = getattr(whisper_model, "tokenizer", None)
+        counts = []
+        for text in texts:
+            if isinstance(text, list):
+                text = text[0] if text else ""
+            counts.append(len(tokenizer.encode(text)) if tokenizer else len(text.split()))
+        return counts
+    
+    def _get_whisper_model(self, model: str, device: str, compute_type: str, language: str, thread_count: int):
+        """Return a cached Whisper model, loading it on first use."""
+        # CTranslate2 fixes its CPU thread pool at load time, so threads are part of the key
+        key = (model, device, compute_type, language, thread_count)
+        if key not in self._whisper_cache:
+            # Prefer weights already converted to this compute type (see prepare_models)
+            prepared = self._prepared_model_dir(model, compute_type)
+            model_path = str(prepared) if (prepared / "model.bin").exists() else model
+            console.print(f"🤖 Loading model{' (prepared)' if model_path != model else ''}...")
+            load_start = time.time()
+            self._whisper_cache[key] = whisperx.load_model(
+                model_path, device, compute_type=compute_type, language=language, threads=thread_count
+            )
+            self._load_times[key] = time.time() - load_start
+        return self._whisper_cache[key]
+    
+    def _prepared_model_dir(self, model: str, compute_type: str) -> Path:
+        """Directory holding the CTranslate2 model pre-quantized to compute_type."""
+        return self.output_dir / "converted" / f"{model}-{compute_type}"
+    
+    def prepare_models(self, model: str, compute_types: List[str]):
+        """Convert and quantize the model once per compute type ahead of the sweep.
+        
+        Loading a prepared directory skips CTranslate2's load-time weight
+        conversion, so model_load_time reflects reading weights only.
+        Existing conversions are reused.
+        """
+        for compute_type in compute_types:
+            if compute_type == "int4":
+                continue
+            output_dir = self._prepared_model_dir(model, compute_type)
+            if (output_dir / "model.bin").exists():
+                continue
+            
+            console.print(f"🛠️ Converting {model} to {compute_type}...")
+            output_dir.parent.mkdir(parents=True, exist_ok=True)
+            cmd = [
+                "ct2-transformers-converter",
+                "--model", f"openai/whisper-{model}",
+                "--quantization", compute_type,
+                "--copy_files", "tokenizer.json", "preprocessor_config.json",
+                "--output_dir", str(output_dir),
+                "--force",
+            ]
+            try:
+                subprocess.run(cmd, capture_output=True, text=True, check=True)
+            except FileNotFoundError:
+                console.print("[yellow]⚠️ ct2-transformers-converter not found, loading from the hub instead[/yellow]")
+                return
+            except subprocess.CalledProcessError as e:
+                console.print(f"[yellow]⚠️ Conversion to {compute_type} failed: {e.stderr.strip()[-200:]}[/yellow]")
+    
+    def _estimate_model_size_mb(self, model: str, compute_type: str) -> Optional[float]:
+        """Estimate in-memory weight size from the cached float16 CTranslate2 model."""
+        prepared = self._prepared_model_dir(model, compute_type) / "model.bin"
+        if prepared.exists():
+            return prepared.stat().st_size / 1024**2
+        try:
+            from faster_whisper.utils import download_model
+            model_dir = Path(download_model(model, local_files_only=True))
+            fp16_mb = (model_dir / "model.bin").stat().st_size / 1024**2
+        except Exception:
+            return None
+        return fp16_mb * WEIGHT_BYTES.get(compute_type, 2.0) / 2.0
+    
+    def _write_wav(self) -> Path:
+        """Write the loaded audio once as 16 kHz mono PCM for external runners."""
+        if self._wav_path is None:
+            pcm = (self.audio.clip(-1.0, 1.0) * 32767).astype("<i2")
+            fd, path = tempfile.mkstemp(suffix=".wav", prefix=f"{self.audio_path.stem}_")
+            os.close(fd)
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(16000)
+                wav.writeframes(pcm.tobytes())
+            self._wav_path = Path(path)
+        return self._wav_path
+    
+    def _transcribe_whisper_cpp(self, language: str, thread_count: int) -> Tuple[Dict, float]:
+        """Transcribe with a quantized ggml model via whisper.cpp.
+        
+        Returns (result, transcribe_time) where transcribe_time excludes model load.
+        """
+        if not self.whisper_cpp or not self.whisper_cpp_model:
+            raise RuntimeError("int4 requires --whisper-cpp and --whisper-cpp-model")
+        
+        wav_path = self._write_wav()
+        output_prefix = wav_path.with_suffix("")
+        cmd = [
+            self.whisper_cpp,
+            "-m", str(self.whisper_cpp_model),
+            "-f", str(wav_path),
+            "-l", language,
+            "-t", str(thread_count),
+            "-oj",
+            "-of", str(output_prefix),
+        ]
+        # The transcript comes from the JSON file, so stdout is discarded and stderr
+        # is parsed line by line instead of being buffered whole
+        timings = {}
+        stderr_tail = deque(maxlen=20)
+        with subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True) as proc:
+            for line in proc.stderr:
+                match = WHISPER_CPP_TIMING_RE.search(line)
+                if match:
+                    timings[match.group(1)] = float(match.group(2))
+                stderr_tail.append(line)
+        if proc.returncode != 0:
+            raise RuntimeError(f"whisper.cpp exited with {proc.returncode}: {''.join(stderr_tail).strip()[-200:]}")
+        
+        transcribe_time = (timings.get("total", 0.0) - timings.get("load", 0.0)) / 1000
+        
+        json_path = Path(f"{output_prefix}.json")
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+        json_path.unlink()
+        
+        segments = [
+            {
+                "start": item["offsets"]["from"] / 1000,
+                "end": item["offsets"]["to"] / 1000,
+                "text": item["text"],
+            }
+            for item in data.get("transcription", [])
+        ]
+        return {"segments": segments, "language": language}, transcribe_time
+    
+    def _get_align_model(self, language: str, device: str) -> Tuple:
+        """Return a cached alignment model and metadata, loading on first use."""
+        key = (language, device)
+        if key not in self._align_cache:
+            console.print("🔗 Loading alignment model...")
+            alignment_model_name = "KBLab/wav2vec2-base-voxpopuli-sv-swedish" if language == "sv" else "WAV2VEC2_ASR_LARGE_LV60K_960H"
+            model_a, metadata = whisperx.load_align_model(
+                language_code=language,
+                device=device,
+                model_name=alignment_model_name
             )
+            if self.compile_align:
+                model_a = torch.compile(model_a, mode="reduce-overhead", fullgraph=False)
+            self._align_cache[key] = (model_a, metadata)
+        return self._align_cache[key]
+    
+    def _align(self, segments: List[Dict], model_a, metadata: Dict, device: str) -> Dict:
+        """Align segments, batching the acoustic model when a bucket size is set."""
+        if self.align_bucket_size == 1:
+            return whisperx.align(
+                segments, 
+                model_a, 
+                metadata, 
+                self.audio, 
+                device, 
+                return_char_alignments=False
+            )
+        return self._align_bucketed(segments, model_a, metadata, device)
+    
+    def _align_bucketed(self, segments: List[Dict], model_a, metadata: Dict, device: str) -> Dict:
+        """Word-level forced alignment with one wav2vec2 pass per bucket of segments.
+        
+        Segments are sorted by length and grouped so padding stays small. The
+        emissions for each bucket come from a single forward call; the CTC
+        trellis and backtrack still run per segment since they are cheap.
+        Text normalisation is simpler than whisperx.align (no sentence
+        splitting, unknown characters are dropped), which is fine for timing.
+        """
+        from whisperx.alignment import get_trellis, backtrack, merge_repeats
+        
+        sample_rate = 16000
+        dictionary = {c.lower(): i for c, i in metadata["dictionary"].items()}
+        blank_id = dictionary.get("[pad]", dictionary.get("<pad>", 0))
+        
+        # Prepare character targets and sample ranges for every segment
+        prepared = []
+        for seg in segments:
+            text = seg["text"].strip().lower()
+            chars = [c for c in text.replace(" ", "|") if c in dictionary]
+            start = int(seg["start"] * sample_rate)
+            end = min(int(seg["end"] * sample_rate), len(self.audio))
+            if not chars or end - start < 400:
+                continue
+            prepared.append((seg, chars, start, end))
+        
+        # Bucket by length so each batch pads to a similar size
+        prepared.sort(key=lambda p: p[3] - p[2])
+        aligned = {}
+        for i in range(0, len(prepared), self.align_bucket_size):
+            bucket = prepared[i:i + self.align_bucket_size]
+            lengths = [end - start for _, _, start, end in bucket]
+            max_len = max(lengths)
+            padded = torch.zeros((len(bucket), max_len))
+            for row, (_, _, start, end) in enumerate(bucket):
+                padded[row, :end - start] = torch.from_numpy(self.audio[start:end])
+            padded = padded.to(device)
+            
+            with torch.inference_mode():
+                if metadata["type"] == "torchaudio":
+                    emissions, _ = model_a(padded, lengths=torch.tensor(lengths, device=device))
+                else:
+                    emissions = model_a(padded).logits
+                emissions = torch.log_softmax(emissions, dim=-1).cpu()
+            
+            # Slice each row back to its own frame count before the trellis step
+            total_frames = emissions.size(1)
+            for row, (seg, chars, start, end) in enumerate(bucket):
+                frames = max(1, round(total_frames * lengths[row] / max_len))
+                emission = emissions[row, :frames]
+                tokens = [dictionary[c] for c in chars]
+                trellis = get_trellis(emission, tokens, blank_id)
+                path = backtrack(trellis, emission, tokens, blank_id)
+                if path is None:
+                    continue
+                char_segments = merge_repeats(path, "".join(chars))
+                ratio = (end - start) / sample_rate / max(1, trellis.size(0) - 1)
+                offset = start / sample_rate
+                
+                # Split character runs on the word delimiter
+                words, current = [], []
+                for cs in char_segments + [None]:
+                    if cs is None or cs.label == "|":
+                        if current:
+                            words.append({
+                                "word": "".join(c.label for c in current),
+                                "start": round(offset + current[0].start * ratio, 3),
+                                "end": round(offset + current[-1].end * ratio, 3),
+                                "score": round(sum(c.score for c in current) / len(current), 3),
+                            })
+                        current = []
+                    else:
+                        current.append(cs)
+                aligned[id(seg)] = words
+        
+        aligned_segments = []
+        for seg in segments:
+            words = aligned.get(id(seg), [])
+            aligned_segments.append({
+                "start": words[0]["start"] if words else seg["start"],
+                "end": words[-1]["end"] if words else seg["end"],
+                "text": seg["text"],
+                "words": words,
+            })
+        return {"segments": aligned_segments}
+    
+    def _settle(self, device: str):
+        """Collect garbage and drain the CUDA queue so trials don't overlap."""
+        gc.collect()
+        if device == "cuda" and torch.cuda.is_available():
+            torch.cuda.synchronize()
+            torch.cuda.empty_cache()
+            free, total = torch.cuda.mem_get_info()
+            if free / total < MIN_FREE_GPU_FRACTION:
+                console.print(f"[yellow]⚠️ Only {free / 1024**2:.0f}MB of GPU memory free before next trial[/yellow]")
+    
+    def release_whisper_models(self):
+        """Drop cached Whisper models and free their memory; alignment models stay.
+        
+        Each (compute type, thread count) is only visited once per sweep, so
+        its model is evicted before the next one loads rather than kept.
+        """
+        self._whisper_cache.clear()
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
+    def release_caches(self):
+        """Drop cached models and free GPU memory."""
+        self.release_whisper_models()
+        self._align_cache.clear()
+        if self._wav_path is not None:
+            self._wav_path.unlink(missing_ok=True)
+            self._wav_path = None
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
+    def close(self):
+        """Unpin and release the shared audio buffer."""
+        if self._shm is None:
+            return
+        if self._host_registered:
+            torch.cuda.cudart().cudaHostUnregister(self.audio.ctypes.data)
+            self._host_registered = False
+        self.audio = None
+        self._shm.close()
+        if self._owns_shm:
+            self._shm.unlink()
+        self._shm = None
     
     def run_comprehensive_benchmark(
         self, 
         compute_types: List[str] = None,
         batch_sizes: List[int] = None,
         device: str = "cpu",
-        language: str = "sv"
+        language: str = "sv",
+        thread_counts: List[int] = None,
+        parallel_configs: int = 1,
+        prepare: bool = False
     ):
         """Run comprehensive benchmark across multiple configurations."""
         
         if compute_types is None:
-            compute_types = ["int8", "float16", "float32"] if device == "cuda" else ["int8", "float32"]
+            compute_types = ["int8", "float16", "bfloat16", "float32"] if device == "cuda" else ["int8", "float32"]
+            if self.whisper_cpp and self.whisper_cpp_model:
+                compute_types.append("int4")
         
         if batch_sizes is None:
             batch_sizes = [4, 8, 16] if device == "cuda" else [4, 8]
         
+        if thread_counts is None:
+            if device == "cuda":
+                thread_counts = [1]
+            else:
+                cpu_count = os.cpu_count() or 4
+                thread_counts = [n for n in (4, 8, 16) if n <= cpu_count] or [cpu_count]
+        
+        total_tests = len(compute_types) * len(thread_counts) * len(batch_sizes)
+        
         console.print(Panel(
             f"[bold blue]🏁 Starting Comprehensive Benchmark[/bold blue]\n"
             f"[cyan]Audio:[/cyan] {self.audio_path.name} ({self.duration:.1f}s)\n"
             f"[cyan]Device:[/cyan] {device.upper()}\n"
             f"[cyan]Language:[/cyan] {language.upper()}\n"
-            f"[cyan]Configurations:[/cyan] {len(compute_types)} × {len(batch_sizes)} = {len(compute_types) * len(batch_sizes)} tests",
+            f"[cyan]Configurations:[/cyan] {len(compute_types)} × {len(thread_counts)} × {len(batch_sizes)} = {total_tests} tests",
             title="🔥 Benchmark Suite",
             border_style="red"
         ))
         
-        total_tests = len(compute_types) * len(batch_sizes)
+        # Convert once up front so workers and trials load the prepared weights
+        if prepare:
+            self.prepare_models("large-v3", compute_types)
+        
+        if parallel_configs > 1 and device == "cpu":
+            # Workers sharing a node contend for its cores, so timings wouldn't match a serial sweep
+            nodes = len(_numa_node_cpus())
+            if parallel_configs > nodes:
+                console.print(
+                    f"[yellow]⚠️ --parallel-configs {parallel_configs} exceeds the {nodes} usable NUMA node(s); "
+                    f"using {max(nodes, 1)} worker(s) so streams don't share cores[/yellow]"
+                )
+                parallel_configs = nodes
+        if parallel_configs > 1 and device == "cpu":
+            self._run_parallel(compute_types, batch_sizes, thread_counts, language, parallel_configs)
+            console.print(f"\n[green]🎉 Benchmark complete! {len(self.results)} configurations tested.[/green]")
+            return
+        if parallel_configs > 1:
+            console.print("[yellow]⚠️ --parallel-configs only applies to CPU runs, running serially[/yellow]")
+        
         current_test = 0
         
         for compute_type in compute_types:
-            for batch_size in batch_sizes:
-                current_test += 1
-                console.print(f"\n[bold]Test {current_test}/{total_tests}[/bold]")
-                
-                result = self.benchmark_configuration(
-                    compute_type=compute_type,
-                    batch_size=batch_size,
-                    device=device,
-                    language=language
-                )
-                self.results.append(result)
+            for thread_count in thread_counts:
+                for batch_size in batch_sizes:
+                    current_test += 1
+                    console.print(f"\n[bold]Test {current_test}/{total_tests}[/bold]")
+                    
+                    result = self.benchmark_configuration(
+                        compute_type=compute_type,
+                        batch_size=batch_size,
+                        device=device,
+                        language=language,
+                        thread_count=thread_count
+                    )
+                    self.results.append(result)
+                    
+                    # Release the previous trial's buffers before the next one starts
+                    self._settle(device)
                 
-                # Short pause between tests
-                time.sleep(2)
+                # This model isn't used again; free it before the next one loads
+                self.release_whisper_models()
+        
+        self.release_caches()
         
         console.print(f"\n[green]🎉 Benchmark complete! {len(self.results)} configurations tested.[/green]")
     
+    def _run_parallel(
+        self,
+        compute_types: List[str],
+        batch_sizes: List[int],
+        thread_counts: List[int],
+        language: str,
+        workers: int
+    ):
+        """Run each compute type's sweep in its own NUMA-pinned worker process."""
+        configs = [
+            [(compute_type, batch_size, thread_count) for thread_count in thread_counts for batch_size in batch_sizes]
+            for compute_type in compute_types
+        ]
+        options = {
+            "whisper_cpp": self.whisper_cpp,
+            "whisper_cpp_model": str(self.whisper_cpp_model) if self.whisper_cpp_model else None,
+            "compile_align": self.compile_align,
+            "align_bucket_size": self.align_bucket_size,
+            "verbose": self.verbose,
+        }
+        
+        # spawn keeps torch/OpenMP state out of the children; they only share the audio buffer
+        ctx = multiprocessing.get_context("spawn")
+        worker_index = ctx.Value("i", 0)
+        console.print(f"🧵 Running {len(configs)} compute-type streams across {workers} worker processes")
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(configs)),
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(worker_index, str(self.audio_path), str(self.output_dir), self._shm.name, len(self.audio), options)
+        ) as executor:
+            futures = [executor.submit(_run_worker_stream, stream, language) for stream in configs]
+            # Reduce in submission order so results match the serial sweep
+            for future in futures:
+                self.results.extend(future.result())
+    
     def display_results(self):
         """Display benchmark results in a formatted table."""
         
@@ -235,37 +783,43 @@ class PerformanceBenchmark:
         table = Table(title="🏆 Benchmark Results", show_header=True, header_style="bold blue")
         table.add_column("Compute", style="cyan")
         table.add_column("Batch", style="yellow")
+        table.add_column("Threads", style="yellow")
+        table.add_column("Load", style="dim")
         table.add_column("Transcribe", style="green")
+        table.add_column("TTFT", style="green")
+        table.add_column("Decode tok/s", style="green")
         table.add_column("Align", style="blue")
+        table.add_column("Align Backend", style="blue")
+        table.add_column("Bucket", style="blue")
         table.add_column("Total", style="magenta")
         table.add_column("Speed", style="bold green")
         table.add_column("Memory", style="dim")
+        table.add_column("Weights", style="dim")
         table.add_column("Quality", style="white")
         
         for result in sorted_results:
             # Speed ranking emoji
-            if result.realtime_factor >= 10:
-                speed_emoji = "🚀"
-            elif result.realtime_factor >= 5:
-                speed_emoji = "⚡"
-            elif result.realtime_factor >= 2:
-                speed_emoji = "🏃"
-            elif result.realtime_factor >= 1:
-                speed_emoji = "🚶"
-            else:
-                speed_emoji = "🐌"
+            speed_emoji = _SPEED_EMOJI[bisect.bisect_right(_SPEED_THRESHOLDS, result.realtime_factor)]
             
             memory_str = f"{result.memory_peak:.0f}MB" if result.memory_peak else "N/A"
+            size_str = f"{result.model_size_mb:.0f}MB" if result.model_size_mb else "N/A"
             quality_str = f"{result.segments_count}seg" if result.segments_count > 0 else "Failed"
             
             table.add_row(
                 result.compute_type,
                 str(result.batch_size),
+                str(result.thread_count) if result.thread_count else "N/A",
+                f"{result.model_load_time:.1f}s" if result.model_load_time is not None else "N/A",
                 f"{result.transcribe_time:.1f}s",
+                f"{result.ttft:.1f}s" if result.ttft is not None else "N/A",
+                f"{result.decode_throughput_tokens_per_s:.0f}" if result.decode_throughput_tokens_per_s else "N/A",
                 f"{result.align_time:.1f}s", 
+                result.align_backend,
+                str(result.align_bucket_size),
                 f"{result.total_time:.1f}s",
                 f"{speed_emoji} {result.realtime_factor:.1f}x",
                 memory_str,
+                size_str,
                 quality_str
             )
         
@@ -278,6 +832,7 @@ class PerformanceBenchmark:
                 f"[bold green]🏆 Best Configuration[/bold green]\n"
                 f"[cyan]Compute Type:[/cyan] {best.compute_type}\n"
                 f"[cyan]Batch Size:[/cyan] {best.batch_size}\n"
+                f"[cyan]Threads:[/cyan] {best.thread_count}\n"
                 f"[cyan]Speed:[/cyan] {best.realtime_factor:.1f}x realtime\n"
                 f"[cyan]Total Time:[/cyan] {best.total_time:.1f}s for {best.duration:.1f}s audio",
                 title="🎯 Recommendation",
@@ -312,7 +867,14 @@ class PerformanceBenchmark:
                     "realtime_factor": r.realtime_factor,
                     "memory_peak": r.memory_peak,
                     "segments_count": r.segments_count,
-                    "words_count": r.words_count
+                    "words_count": r.words_count,
+                    "model_size_mb": r.model_size_mb,
+                    "model_load_time": r.model_load_time,
+                    "ttft": r.ttft,
+                    "decode_throughput_tokens_per_s": r.decode_throughput_tokens_per_s,
+                    "thread_count": r.thread_count,
+                    "align_backend": r.align_backend,
+                    "align_bucket_size": r.align_bucket_size
                 }
                 for r in self.results
             ]
@@ -324,6 +886,80 @@ class PerformanceBenchmark:
         console.print(f"[green]💾 Results saved to: {output_file}[/green]")
 
 
+def _numa_node_cpus() -> List[set]:
+    """CPUs of each NUMA node that this process may run on; nodes left with none are skipped.
+    
+    Intersecting with the current affinity keeps cpuset-restricted containers
+    from pinning to CPUs they aren't allowed. Empty without NUMA/affinity support.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return []
+    allowed = os.sched_getaffinity(0)
+    node_cpus = []
+    for node in sorted(Path("/sys/devices/system/node").glob("node[0-9]*")):
+        cpus = set()
+        try:
+            cpulist = (node / "cpulist").read_text().strip()
+        except OSError:
+            continue
+        for part in cpulist.split(","):
+            if "-" in part:
+                first, last = part.split("-")
+                cpus.update(range(int(first), int(last) + 1))
+            elif part:
+                cpus.add(int(part))
+        if cpus & allowed:
+            node_cpus.append(cpus & allowed)
+    return node_cpus
+
+
+def _pin_numa(worker_index) -> None:
+    """Pin the calling process to the CPUs of one NUMA node, round-robin by worker.
+    
+    Scheduler affinity alone makes first-touch allocations (model weights)
+    land on the local memory controller, so libnuma isn't needed.
+    """
+    with worker_index.get_lock():
+        index = worker_index.value
+        worker_index.value += 1
+    
+    node_cpus = _numa_node_cpus()
+    if node_cpus:
+        os.sched_setaffinity(0, node_cpus[index % len(node_cpus)])
+
+
+_worker_benchmark: Optional[PerformanceBenchmark] = None
+
+
+def _init_worker(worker_index, audio_path: str, output_dir: str, shm_name: str, n_samples: int, options: Dict):
+    """Process pool initializer: pin to a NUMA node and attach to the shared audio."""
+    global _worker_benchmark
+    _pin_numa(worker_index)
+    _worker_benchmark = PerformanceBenchmark(
+        audio_path, output_dir, shared_audio=(shm_name, n_samples), **options
+    )
+
+
+def _run_worker_stream(stream: List[Tuple[str, int, int]], language: str) -> List[BenchmarkResult]:
+    """Run one compute type's configurations serially inside a worker."""
+    results = []
+    previous = None
+    for compute_type, batch_size, thread_count in stream:
+        # Stream is grouped by thread count; each model is done once the count changes
+        if previous is not None and (compute_type, thread_count) != previous:
+            _worker_benchmark.release_whisper_models()
+        previous = (compute_type, thread_count)
+        results.append(_worker_benchmark.benchmark_configuration(
+            compute_type=compute_type,
+            batch_size=batch_size,
+            device="cpu",
+            language=language,
+            thread_count=thread_count
+        ))
+    _worker_benchmark.release_caches()
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Benchmark WhisperX performance across different configurations",
@@ -334,6 +970,13 @@ Examples:
   %(prog)s audio.m4a --device cuda             # GPU benchmark
   %(prog)s audio.m4a --compute-types int8      # Test only int8
   %(prog)s audio.m4a --batch-sizes 4,8,16      # Test specific batch sizes
+  %(prog)s audio.m4a --thread-counts 4,8       # Sweep CPU thread counts
+  %(prog)s audio.m4a --prepare-models         # Load pre-quantized weights per compute type
+  %(prog)s audio.m4a --parallel-configs 2      # One process per compute type (multi-socket CPU)
+  %(prog)s audio.m4a --compile-align           # torch.compile the alignment model
+  %(prog)s audio.m4a --align-bucket-size 1     # Stock per-segment whisperx.align
+  %(prog)s audio.m4a --whisper-cpp whisper-cli --whisper-cpp-model ggml-large-v3-q4_0.bin
+                                               # Add an int4 arm via whisper.cpp
         """
     )
     parser.add_argument("audio", help="Input audio file path")
@@ -341,6 +984,14 @@ Examples:
     parser.add_argument("--language", "-l", default="sv", help="Language code (default: sv)")
     parser.add_argument("--compute-types", help="Comma-separated compute types (e.g., int8,float16,float32)")
     parser.add_argument("--batch-sizes", help="Comma-separated batch sizes (e.g., 4,8,16)")
+    parser.add_argument("--thread-counts", help="Comma-separated CPU thread counts (e.g., 4,8,16)")
+    parser.add_argument("--prepare-models", action="store_true", help="Convert/quantize the model once per compute type before the sweep (needs ct2-transformers-converter)")
+    parser.add_argument("--parallel-configs", type=int, default=1, help="Run compute types concurrently in N NUMA-pinned processes, at most one per NUMA node (CPU only)")
+    parser.add_argument("--compile-align", action="store_true", help="Run the alignment model through torch.compile")
+    parser.add_argument("--align-bucket-size", type=int, default=8, help="Segments per batched alignment pass; 1 uses stock whisperx.align (default: 8)")
+    parser.add_argument("--whisper-cpp", help="Path to whisper.cpp CLI binary (enables the int4 arm)")
+    parser.add_argument("--whisper-cpp-model", help="Path to a 4-bit ggml model (e.g., ggml-large-v3-q4_0.bin)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show whisperx progress during timed transcription")
     parser.add_argument("--output-dir", default="./benchmark_results", help="Output directory for results")
     parser.add_argument("--save", action="store_true", help="Save results to JSON file")
     
@@ -367,14 +1018,33 @@ Examples:
     if args.batch_sizes:
         batch_sizes = [int(bs.strip()) for bs in args.batch_sizes.split(',')]
     
+    # Parse thread counts
+    thread_counts = None
+    if args.thread_counts:
+        thread_counts = [int(tc.strip()) for tc in args.thread_counts.split(',')]
+    
     # Run benchmark
-    benchmark = PerformanceBenchmark(args.audio, args.output_dir)
-    benchmark.run_comprehensive_benchmark(
-        compute_types=compute_types,
-        batch_sizes=batch_sizes,
-        device=args.device,
-        language=args.language
+    benchmark = PerformanceBenchmark(
+        args.audio,
+        args.output_dir,
+        whisper_cpp=args.whisper_cpp,
+        whisper_cpp_model=args.whisper_cpp_model,
+        compile_align=args.compile_align,
+        align_bucket_size=args.align_bucket_size,
+        verbose=args.verbose
     )
+    try:
+        benchmark.run_comprehensive_benchmark(
+            compute_types=compute_types,
+            batch_sizes=batch_sizes,
+            device=args.device,
+            language=args.language,
+            thread_counts=thread_counts,
+            parallel_configs=args.parallel_configs,
+            prepare=args.prepare_models
+        )
+    finally:
+        benchmark.close()
     
     # Display and optionally save results
     benchmark.display_results()
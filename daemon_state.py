@@ -3,16 +3,72 @@
 WhisperX Daemon State Management
 
 Manages state files and Unix socket communication for the WhisperBar SwiftUI app.
+
+Socket protocol: each message in either direction is one UTF-8 JSON object
+terminated by a single newline. Client commands are bounded by
+MAX_COMMAND_BYTES; a client that exceeds it is disconnected.
 """
 
 import asyncio
 import json
 import os
-from dataclasses import asdict, dataclass, field
+import time
+from collections import deque
+from dataclasses import dataclass, field, is_dataclass
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from secrets import token_hex
 from typing import Optional
 
+# Minimum interval between state.json rewrites for progress-only updates (seconds)
+STATE_WRITE_INTERVAL = 0.25
+
+# Upper bound on a single client command line; commands are tiny JSON objects
+MAX_COMMAND_BYTES = 64 * 1024
+
+# How long a debounced state write may stay pending before the server flushes it (seconds)
+STATE_FLUSH_INTERVAL = 1.0
+
+# Most recent transcripts kept in memory and in history.json
+HISTORY_LIMIT = 50
+
+# Parsed history.json keyed by path, valid while (mtime_ns, size) match the file
+_history_cache: dict[Path, tuple[int, int, list["CompletedTranscript"]]] = {}
+
+
+def _json_default(obj):
+    """Serialize dataclasses shallowly; json recurses into the field values itself.
+
+    Cheaper than dataclasses.asdict, which deep-copies every field first.
+    """
+    if is_dataclass(obj):
+        return obj.__dict__
+    return str(obj)
+
+
+def _dumps(obj) -> str:
+    """Compact JSON encoding (indent=None keeps json on its C encoder)."""
+    return json.dumps(obj, default=_json_default, separators=(",", ":"))
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to path atomically via a temp file and os.replace.
+
+    Readers see either the old or the new complete file, never a partial one.
+    """
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
 
 @dataclass
 class TranscriptionProgress:
@@ -57,60 +113,139 @@ class StateManager:
 
         self.state_dir.mkdir(parents=True, exist_ok=True)
         self._state = DaemonState()
-        self._history: list[CompletedTranscript] = []
-        self._clients: list[asyncio.StreamWriter] = []
+        # Files being transcribed right now (several with --workers); state.current
+        # shows the most recently started one and the daemon only goes idle when empty
+        self._active: dict[str, TranscriptionProgress] = {}
+        self._history_items: Optional[deque[CompletedTranscript]] = None
+        self._clients: set[asyncio.StreamWriter] = set()
         self._server: Optional[asyncio.Server] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # Set when a write is deferred; the flusher sleeps on it instead of polling
+        self._flush_wanted: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Debounce state.json writes; clients get every update over the socket anyway
+        self._last_state_write_monotonic: float = 0.0
+        self._last_flushed_status: Optional[str] = None
+        self._state_dirty = False
+
+        # Serialized replies for status/history queries, rebuilt only after a change
+        self._state_json_cache: Optional[bytes] = None
+        self._history_json_cache: Optional[bytes] = None
+
+        # Drop temp files left behind by an interrupted atomic write
+        for path in (self.history_file, self.state_file):
+            tmp_path = Path(f"{path}.tmp")
+            if tmp_path.exists():
+                tmp_path.unlink()
 
-        self._load_history()
         self.set_idle()  # Write initial state file
 
-    def _load_history(self):
-        """Load transcript history from disk."""
-        if self.history_file.exists():
-            try:
-                data = json.loads(self.history_file.read_text())
-                self._history = [
-                    CompletedTranscript(**t) for t in data.get("transcripts", [])
-                ]
-            except (json.JSONDecodeError, TypeError):
-                self._history = []
-        else:
-            self._history = []
+    @property
+    def _history(self) -> deque[CompletedTranscript]:
+        """Transcript history, loaded from disk on first access."""
+        if self._history_items is None:
+            self._history_items = deque(self._load_history(), maxlen=HISTORY_LIMIT)
+        return self._history_items
+
+    def _load_history(self) -> list[CompletedTranscript]:
+        """Load transcript history from disk, reusing an earlier parse if unchanged."""
+        try:
+            st = self.history_file.stat()
+        except FileNotFoundError:
+            return []
+
+        cached = _history_cache.get(self.history_file)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+
+        try:
+            data = json.loads(self.history_file.read_bytes())
+            transcripts = [
+                CompletedTranscript(**t) for t in data.get("transcripts", [])
+            ]
+        except (json.JSONDecodeError, TypeError):
+            return []
+        _history_cache[self.history_file] = (st.st_mtime_ns, st.st_size, transcripts)
+        return transcripts
 
     def _save_history(self):
         """Save transcript history to disk."""
-        data = {"transcripts": [asdict(t) for t in self._history[:50]]}
-        self.history_file.write_text(json.dumps(data, indent=2, default=str))
+        self._history_json_cache = None
+        _atomic_write_bytes(
+            self.history_file, _dumps({"transcripts": list(self._history)}).encode()
+        )
+
+    def _save_state(self, force: bool = False):
+        """Save current daemon state to disk.
+
+        Writes are debounced to at most one per STATE_WRITE_INTERVAL unless
+        forced or the status changed; skipped writes wake the flusher,
+        which writes them out within STATE_FLUSH_INTERVAL.
+        """
+        self._state_dirty = True
+        self._state_json_cache = None
+        now = time.monotonic()
+        if (
+            not force
+            and self._state.status == self._last_flushed_status
+            and now - self._last_state_write_monotonic < STATE_WRITE_INTERVAL
+        ):
+            if self._flush_task is not None:
+                # May be called from a transcription thread
+                self._loop.call_soon_threadsafe(self._flush_wanted.set)
+            return
 
-    def _save_state(self):
-        """Save current daemon state to disk."""
         state_dict = {
             "status": self._state.status,
-            "current": asdict(self._state.current) if self._state.current else None,
+            "current": self._state.current,
             "queue": self._state.queue,
             "last_updated": datetime.now().isoformat(),
             "error_message": self._state.error_message,
         }
-        self.state_file.write_text(json.dumps(state_dict, indent=2, default=str))
+        _atomic_write_bytes(self.state_file, _dumps(state_dict).encode())
+
+        self._state_dirty = False
+        self._last_state_write_monotonic = now
+        self._last_flushed_status = self._state.status
+
+    async def _flush_state_periodically(self):
+        """Flush debounced state writes that would otherwise be left pending.
+
+        Sleeps until a write is deferred, so an idle daemon never wakes up.
+        """
+        while True:
+            await self._flush_wanted.wait()
+            await asyncio.sleep(STATE_FLUSH_INTERVAL)
+            self._flush_wanted.clear()
+            if self._state_dirty:
+                self._save_state(force=True)
 
     async def broadcast(self, event: dict):
         """Send event to all connected SwiftUI clients."""
         if not self._clients:
             return
 
-        msg = json.dumps(event, default=str) + "\n"
-        msg_bytes = msg.encode()
+        msg_bytes = (_dumps(event) + "\n").encode()
 
-        disconnected = []
-        for client in self._clients:
-            try:
-                client.write(msg_bytes)
-                await client.drain()
-            except (ConnectionResetError, BrokenPipeError, OSError):
-                disconnected.append(client)
+        # Drain all clients concurrently so one slow reader doesn't delay the rest
+        clients = list(self._clients)
+        results = await asyncio.gather(
+            *(self._write_and_drain(client, msg_bytes) for client in clients),
+            return_exceptions=True,
+        )
 
-        for client in disconnected:
-            self._clients.remove(client)
+        self._clients -= {
+            client
+            for client, result in zip(clients, results)
+            if isinstance(result, (ConnectionResetError, BrokenPipeError, OSError))
+        }
+
+    @staticmethod
+    async def _write_and_drain(client: asyncio.StreamWriter, msg_bytes: bytes):
+        """Write a message to one client and wait for its buffer to drain."""
+        client.write(msg_bytes)
+        await client.drain()
 
     def write_pid(self):
         """Write daemon PID file."""
@@ -121,20 +256,44 @@ class StateManager:
         if self.pid_file.exists():
             self.pid_file.unlink()
 
-    async def on_transcription_start(
-        self, filename: str, duration_seconds: float
-    ) -> None:
-        """Called when a transcription begins."""
-        self._state.status = "transcribing"
-        self._state.current = TranscriptionProgress(
+    def _start_file(self, filename: str, duration_seconds: float) -> None:
+        """Mark filename as running and show it as the current transcription."""
+        progress = TranscriptionProgress(
             filename=filename,
             started_at=datetime.now().isoformat(),
             duration_seconds=duration_seconds,
             progress_percent=0.0,
             stage="loading",
         )
+        self._active[filename] = progress
+        self._state.status = "transcribing"
+        self._state.current = progress
         self._state.error_message = None
-        self._save_state()
+        self._save_state(force=True)
+
+    def _finish_file(self, filename: str, error: Optional[str] = None) -> None:
+        """Drop filename from the running files.
+
+        The daemon goes idle (or error, if this file failed) only once no
+        other file is still running; until then current moves to the most
+        recently started file that is.
+        """
+        self._active.pop(filename, None)
+        if error is not None:
+            self._state.error_message = error
+        if self._active:
+            self._state.status = "transcribing"
+            self._state.current = next(reversed(self._active.values()))
+        else:
+            self._state.status = "error" if error is not None else "idle"
+            self._state.current = None
+        self._save_state(force=True)
+
+    async def on_transcription_start(
+        self, filename: str, duration_seconds: float
+    ) -> None:
+        """Called when a transcription begins."""
+        self._start_file(filename, duration_seconds)
 
         await self.broadcast(
             {
@@ -169,10 +328,8 @@ class StateManager:
         speaker_count: int,
     ) -> None:
         """Called when a transcription completes successfully."""
-        import uuid
-
         transcript = CompletedTranscript(
-            id=str(uuid.uuid4())[:8],
+            id=token_hex(4),
             original_filename=filename,
             transcript_path=transcript_path,
             completed_at=datetime.now().isoformat(),
@@ -182,13 +339,9 @@ class StateManager:
             success=True,
         )
 
-        self._history.insert(0, transcript)
-        self._history = self._history[:50]  # Keep last 50
+        self._history.appendleft(transcript)
         self._save_history()
-
-        self._state.status = "idle"
-        self._state.current = None
-        self._save_state()
+        self._finish_file(filename)
 
         await self.broadcast(
             {
@@ -205,10 +358,8 @@ class StateManager:
 
     async def on_transcription_failed(self, filename: str, error: str) -> None:
         """Called when a transcription fails."""
-        import uuid
-
         transcript = CompletedTranscript(
-            id=str(uuid.uuid4())[:8],
+            id=token_hex(4),
             original_filename=filename,
             transcript_path="",
             completed_at=datetime.now().isoformat(),
@@ -219,14 +370,9 @@ class StateManager:
             error=error,
         )
 
-        self._history.insert(0, transcript)
-        self._history = self._history[:50]
+        self._history.appendleft(transcript)
         self._save_history()
-
-        self._state.status = "error"
-        self._state.current = None
-        self._state.error_message = error
-        self._save_state()
+        self._finish_file(filename, error)
 
         await self.broadcast(
             {
@@ -244,23 +390,15 @@ class StateManager:
 
     def set_idle(self) -> None:
         """Set daemon to idle state."""
+        self._active.clear()
         self._state.status = "idle"
         self._state.current = None
         self._state.error_message = None
-        self._save_state()
+        self._save_state(force=True)
 
     def set_transcribing_sync(self, filename: str, duration_seconds: float) -> None:
         """Synchronously set transcription state (for use outside async context)."""
-        self._state.status = "transcribing"
-        self._state.current = TranscriptionProgress(
-            filename=filename,
-            started_at=datetime.now().isoformat(),
-            duration_seconds=duration_seconds,
-            progress_percent=0.0,
-            stage="loading",
-        )
-        self._state.error_message = None
-        self._save_state()
+        self._start_file(filename, duration_seconds)
 
     def set_completed_sync(
         self,
@@ -271,10 +409,8 @@ class StateManager:
         speaker_count: int,
     ) -> None:
         """Synchronously record completion (for use outside async context)."""
-        import uuid
-
         transcript = CompletedTranscript(
-            id=str(uuid.uuid4())[:8],
+            id=token_hex(4),
             original_filename=filename,
             transcript_path=transcript_path,
             completed_at=datetime.now().isoformat(),
@@ -284,17 +420,14 @@ class StateManager:
             success=True,
         )
 
-        self._history.insert(0, transcript)
-        self._history = self._history[:50]
+        self._history.appendleft(transcript)
         self._save_history()
-        self.set_idle()
+        self._finish_file(filename)
 
     def set_failed_sync(self, filename: str, error: str) -> None:
         """Synchronously record failure (for use outside async context)."""
-        import uuid
-
         transcript = CompletedTranscript(
-            id=str(uuid.uuid4())[:8],
+            id=token_hex(4),
             original_filename=filename,
             transcript_path="",
             completed_at=datetime.now().isoformat(),
@@ -305,70 +438,72 @@ class StateManager:
             error=error,
         )
 
-        self._history.insert(0, transcript)
-        self._history = self._history[:50]
+        self._history.appendleft(transcript)
         self._save_history()
+        self._finish_file(filename, error)
 
-        self._state.status = "error"
-        self._state.current = None
-        self._state.error_message = error
-        self._save_state()
+    def _state_reply(self) -> bytes:
+        """Serialized reply to a status command (cached until the state changes)."""
+        if self._state_json_cache is None:
+            state_dict = {
+                "event": "state",
+                "status": self._state.status,
+                "current": self._state.current,
+                "queue": self._state.queue,
+            }
+            self._state_json_cache = (_dumps(state_dict) + "\n").encode()
+        return self._state_json_cache
+
+    def _history_reply(self) -> bytes:
+        """Serialized reply to a history command (cached until history changes)."""
+        if self._history_json_cache is None:
+            history_dict = {
+                "event": "history",
+                "transcripts": list(islice(self._history, 20)),
+            }
+            self._history_json_cache = (_dumps(history_dict) + "\n").encode()
+        return self._history_json_cache
 
     async def _handle_client(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     ):
         """Handle a connected SwiftUI client."""
-        self._clients.append(writer)
+        self._clients.add(writer)
 
         try:
             # Send current state on connect
             state_dict = {
                 "event": "state",
                 "status": self._state.status,
-                "current": asdict(self._state.current) if self._state.current else None,
+                "current": self._state.current,
                 "queue": self._state.queue,
-                "history": [asdict(t) for t in self._history[:10]],
+                "history": list(islice(self._history, 10)),
             }
-            writer.write((json.dumps(state_dict, default=str) + "\n").encode())
+            writer.write((_dumps(state_dict) + "\n").encode())
             await writer.drain()
             while True:
-                data = await reader.readline()
+                try:
+                    data = await reader.readline()
+                except ValueError:
+                    # Line exceeded MAX_COMMAND_BYTES without a newline
+                    break
                 if not data:
                     break
 
                 try:
-                    cmd = json.loads(data.decode())
+                    cmd = json.loads(data)
                     if cmd.get("command") == "status":
-                        state_dict = {
-                            "event": "state",
-                            "status": self._state.status,
-                            "current": (
-                                asdict(self._state.current)
-                                if self._state.current
-                                else None
-                            ),
-                            "queue": self._state.queue,
-                        }
-                        writer.write(
-                            (json.dumps(state_dict, default=str) + "\n").encode()
-                        )
+                        writer.write(self._state_reply())
                         await writer.drain()
                     elif cmd.get("command") == "history":
-                        history_dict = {
-                            "event": "history",
-                            "transcripts": [asdict(t) for t in self._history[:20]],
-                        }
-                        writer.write(
-                            (json.dumps(history_dict, default=str) + "\n").encode()
-                        )
+                        writer.write(self._history_reply())
                         await writer.drain()
                 except json.JSONDecodeError:
                     pass
         except (ConnectionResetError, BrokenPipeError, OSError):
             pass
         finally:
-            if writer in self._clients:
-                self._clients.remove(writer)
+            self._clients.discard(writer)
             writer.close()
             try:
                 await writer.wait_closed()
@@ -381,19 +516,29 @@ class StateManager:
             self.socket_path.unlink()
 
         self._server = await asyncio.start_unix_server(
-            self._handle_client, path=str(self.socket_path)
+            self._handle_client, path=str(self.socket_path), limit=MAX_COMMAND_BYTES
         )
         # Make socket readable by all users
         os.chmod(self.socket_path, 0o666)
 
+        self._loop = asyncio.get_running_loop()
+        self._flush_wanted = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_state_periodically())
+
     async def stop_server(self):
         """Stop the Unix socket server."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._state_dirty:
+            self._save_state(force=True)
+
         if self._server:
             self._server.close()
             await self._server.wait_closed()
 
-        # Close all client connections
-        for client in self._clients:
+        # Close all client connections (handlers discard themselves as they exit)
+        for client in list(self._clients):
             client.close()
             try:
                 await client.wait_closed()
@@ -3,45 +3,137 @@
 Quick language detection test - compares auto-detection vs forced Swedish
 """
 
+import os
 import sys
-import subprocess
+import json
+import hashlib
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from rich.console import Console
+import whisperx
+from whisperx.asr import WhisperModel
+from whisperx.audio import N_SAMPLES, log_mel_spectrogram
+from faster_whisper.tokenizer import Tokenizer
+import numpy as np
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 
 console = Console()
 
-def run_transcription_test(audio_path: str, language: str = None) -> dict:
-    """Run transcription and return basic info."""
+# Decoder settings matching whisperx's defaults
+BEAM_SIZE = 5
+MAX_LENGTH = 448
+
+# (table label, language, progress message) for each compared mode
+MODES = [
+    ("Auto-detect", None, "🔍 Testing auto-detection..."),
+    ("Swedish (sv)", "sv", "🇸🇪 Testing forced Swedish..."),
+    ("English (en)", "en", "🇺🇸 Testing forced English..."),
+]
+
+# Results are memoized per audio content and language here
+CACHE_DIR = Path("./test_output/.cache")
+
+def audio_digest(audio_path: str) -> str:
+    """Content hash of the audio file, so renamed copies still hit the cache."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(audio_path, "rb") as f:
+        # 1 MiB chunks keep memory flat for multi-GB recordings
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_file(digest: str, language: str = None) -> Path:
+    return CACHE_DIR / f"{digest}-{language or 'auto'}.json"
+
+def load_cached_result(audio_path: str, digest: str, language: str = None):
+    """Return a cached result for this file and language, or None if missing/stale."""
+    cache_file = _cache_file(digest, language)
     try:
-        cmd = [
-            sys.executable,
-            "transcribe.py",
-            audio_path,
-            "--no-diarize",
-            "-o", "./test_output"
-        ]
-        
-        if language:
-            cmd.extend(["-l", language])
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=180)
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if cached.get("mtime") != os.path.getmtime(audio_path):
+        return None
+    return cached["result"]
+
+def save_cached_result(audio_path: str, digest: str, language: str, result: dict):
+    """Store a successful result next to the audio file's mtime."""
+    if not result['success']:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    payload = {"mtime": os.path.getmtime(audio_path), "result": result}
+    _cache_file(digest, language).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+@lru_cache(maxsize=1)
+def load_whisper_cached(
+    model_name: str = "large-v3",
+    device: str = "cpu",
+    compute_type: str = "float32",
+    cpu_threads: int = 0,
+    num_workers: int = 1
+) -> WhisperModel:
+    """Load a bare faster-whisper model (no VAD pipeline), reused within the process.
+    
+    Shared by quick_language_test.py and test_language_detection.py; both only
+    need the encoder, detect_language and generate.
+    """
+    return WhisperModel(
+        model_name,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers
+    )
+
+def encode_audio(model, audio, batch_size: int = 8) -> list:
+    """Run the Whisper encoder once over 30s windows of the audio.
+    
+    The encoder output doesn't depend on the language, so every mode
+    decodes from the same list of batched outputs.
+    """
+    windows = []
+    for start in range(0, len(audio), N_SAMPLES):
+        chunk = audio[start:start + N_SAMPLES]
+        mel = log_mel_spectrogram(chunk, n_mels=model.model.n_mels, padding=N_SAMPLES - chunk.shape[0])
+        windows.append(mel.numpy())
+    
+    return [
+        model.encode(np.stack(windows[i:i + batch_size]))
+        for i in range(0, len(windows), batch_size)
+    ]
+
+def run_transcription_test(model, encoder_outputs: list, language: str = None) -> dict:
+    """Decode precomputed encoder outputs in one language and return basic info."""
+    try:
+        whisper = model
+        detected = language
+        if language is None:
+            # Auto-detect from the first window, like whisperx does
+            lang_token, _ = whisper.model.detect_language(encoder_outputs[0])[0][0]
+            detected = lang_token[2:-2]
         
-        # Try to read the output file
-        audio_name = Path(audio_path).stem
-        output_file = Path("./test_output") / f"{audio_name}.txt"
+        tokenizer = Tokenizer(whisper.hf_tokenizer, whisper.model.is_multilingual, task="transcribe", language=detected)
+        prompt = whisper.get_prompt(tokenizer, [], without_timestamps=True)
         
-        transcribed_text = ""
-        if output_file.exists():
-            with open(output_file, 'r', encoding='utf-8') as f:
-                transcribed_text = f.read().strip()
+        texts = []
+        for encoder_output in encoder_outputs:
+            batch = whisper.model.generate(
+                encoder_output,
+                [prompt] * encoder_output.shape[0],
+                beam_size=BEAM_SIZE,
+                max_length=MAX_LENGTH,
+                suppress_blank=True,
+                suppress_tokens=[-1]
+            )
+            texts.extend(tokenizer.decode(r.sequences_ids[0]).strip() for r in batch)
         
         return {
-            'success': result.returncode == 0,
-            'text': transcribed_text,
+            'success': True,
+            'text': " ".join(t for t in texts if t),
             'language': language or "auto-detect",
-            'stdout': result.stdout
+            'detected': detected
         }
     
     except Exception as e:
@@ -49,7 +141,7 @@ def run_transcription_test(audio_path: str, language: str = None) -> dict:
             'success': False,
             'text': f"Error: {e}",
             'language': language or "auto-detect",
-            'stdout': ""
+            'detected': None
         }
 
 def main():
@@ -69,70 +161,89 @@ def main():
         border_style="blue"
     ))
     
-    # Test auto-detection
-    console.print("🔍 Testing auto-detection...")
-    auto_result = run_transcription_test(audio_path)
-    
-    # Test forced Swedish
-    console.print("🇸🇪 Testing forced Swedish...")
-    swedish_result = run_transcription_test(audio_path, "sv")
-    
-    # Test forced English
-    console.print("🇺🇸 Testing forced English...")
-    english_result = run_transcription_test(audio_path, "en")
+    # Reuse earlier results for this exact audio content
+    digest = audio_digest(audio_path)
+    cached = {language: load_cached_result(audio_path, digest, language) for _, language, _ in MODES}
+    pending = [(mode, language, message) for mode, language, message in MODES if cached[language] is None]
+    
+    if pending:
+        # Decode audio and load the model once for all remaining runs
+        console.print("📁 Loading audio file...")
+        audio = whisperx.load_audio(audio_path)
+        console.print("🤖 Loading Whisper model...")
+        # No VAD/pipeline needed; one CTranslate2 worker per mode so the decodes can overlap
+        model = load_whisper_cached(
+            "large-v3",
+            device="cpu",
+            compute_type="float32",
+            cpu_threads=max(1, (os.cpu_count() or 4) // len(pending)),
+            num_workers=len(pending)
+        )
+        
+        # Encode once; the modes only differ in the decoder prompt
+        console.print("🧠 Encoding audio...")
+        encoder_outputs = encode_audio(model, audio)
+        
+        # CTranslate2 releases the GIL while decoding, so threads run the modes in parallel
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = []
+            for mode, language, message in pending:
+                console.print(message)
+                future = executor.submit(run_transcription_test, model, encoder_outputs, language)
+                future.add_done_callback(lambda f, mode=mode: console.print(f"  ✔️ {mode} done"))
+                futures.append((language, future))
+            for language, future in futures:
+                cached[language] = future.result(timeout=300)
+                save_cached_result(audio_path, digest, language, cached[language])
+    else:
+        console.print("[dim]♻️ Using cached results[/dim]")
     
-    # Display results
-    console.print("\n📊 Results Comparison:")
+    results = [(mode, cached[language]) for mode, language, _ in MODES]
+    auto_result, swedish_result, english_result = (r for _, r in results)
     
+    # Display results (built up and rendered in one print)
     table = Table(show_header=True, header_style="bold blue")
     table.add_column("Mode", style="cyan")
     table.add_column("Success", style="green")
     table.add_column("Transcribed Text", style="yellow")
     
-    results = [
-        ("Auto-detect", auto_result),
-        ("Swedish (sv)", swedish_result),
-        ("English (en)", english_result)
-    ]
-    
     for mode, result in results:
         success_icon = "✅" if result['success'] else "❌"
         text_preview = result['text'][:100] + "..." if len(result['text']) > 100 else result['text']
         table.add_row(mode, success_icon, text_preview)
     
-    console.print(table)
+    output = ["\n📊 Results Comparison:", table]
     
     # Analysis
-    console.print("\n💡 Analysis:")
+    output.append("\n💡 Analysis:")
     
     if auto_result['text'] and swedish_result['text']:
         if auto_result['text'].strip() == swedish_result['text'].strip():
-            console.print("[green]✅ Auto-detection correctly identified Swedish![/green]")
+            output.append("[green]✅ Auto-detection correctly identified Swedish![/green]")
         elif len(swedish_result['text']) > len(auto_result['text']):
-            console.print("[yellow]⚠️ Swedish transcription is longer - may be more accurate[/yellow]")
-            console.print("[yellow]💡 Consider using -l sv for Swedish audio[/yellow]")
+            output.append("[yellow]⚠️ Swedish transcription is longer - may be more accurate[/yellow]")
+            output.append("[yellow]💡 Consider using -l sv for Swedish audio[/yellow]")
         else:
-            console.print("[blue]ℹ️ Different results between auto and Swedish transcription[/blue]")
+            output.append("[blue]ℹ️ Different results between auto and Swedish transcription[/blue]")
     
     # Show recommendation
-    text_lengths = {
-        'auto': len(auto_result['text']) if auto_result['text'] else 0,
-        'sv': len(swedish_result['text']) if swedish_result['text'] else 0,
-        'en': len(english_result['text']) if english_result['text'] else 0
-    }
+    best_mode, best_len = max(
+        (("auto", len(auto_result['text'])), ("sv", len(swedish_result['text'])), ("en", len(english_result['text']))),
+        key=lambda t: t[1]
+    )
     
-    best_mode = max(text_lengths, key=text_lengths.get)
-    
-    if text_lengths[best_mode] > 0:
-        console.print(f"\n🏆 Best result: [bold green]{best_mode}[/bold green] ({text_lengths[best_mode]} characters)")
+    if best_len > 0:
+        output.append(f"\n🏆 Best result: [bold green]{best_mode}[/bold green] ({best_len} characters)")
         if best_mode == 'sv':
-            console.print("[green]💡 Recommendation: Use -l sv for this audio[/green]")
+            output.append("[green]💡 Recommendation: Use -l sv for this audio[/green]")
         elif best_mode == 'en':
-            console.print("[green]💡 Recommendation: Use -l en for this audio[/green]")
+            output.append("[green]💡 Recommendation: Use -l en for this audio[/green]")
         else:
-            console.print("[green]💡 Auto-detection works well for this audio[/green]")
+            output.append("[green]💡 Auto-detection works well for this audio[/green]")
     else:
-        console.print("[red]❌ No successful transcriptions - check audio file[/red]")
+        output.append("[red]❌ No successful transcriptions - check audio file[/red]")
+    
+    console.print(Group(*output))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
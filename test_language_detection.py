@@ -5,21 +5,110 @@ Test script to analyze language detection issues
 
 import sys
 import time
+import argparse
+from dataclasses import dataclass
 from pathlib import Path
-import whisperx
-import torch
-from rich.console import Console
+from typing import TYPE_CHECKING
+import numpy as np
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 
+# whisperx/torch are imported where they're used so importing this module stays cheap
+if TYPE_CHECKING:
+    import torch
+
 console = Console()
 
-def test_language_detection_methods(audio_path: str, sample_durations=[10, 30, 60]):
-    """Test different language detection methods and durations."""
+SAMPLE_RATE = 16000
+
+# Mel frames per second (hop length 160 at 16 kHz) and per 30s Whisper window
+FRAMES_PER_SECOND = 100
+WINDOW_FRAMES = 3000
+
+# Skip the longer samples once the shortest start and middle samples both agree this strongly
+CONFIDENT_PROBABILITY = 0.95
+
+@dataclass(frozen=True)
+class AudioContext:
+    """Loop invariants for the sample sweep, computed once per file."""
+    n_samples: int
+    longest: int            # longest sample, in audio samples
+    middle_offset: int      # start of the longest centred middle sample
+    longest_frames: int     # longest sample, in mel frames
+    slices: tuple           # (duration, sample_frames, middle_frame_offset) per duration
+    
+    @classmethod
+    def build(cls, n_samples: int, sample_durations) -> "AudioContext":
+        longest = min(max(sample_durations) * SAMPLE_RATE, n_samples)
+        longest_frames = longest // 160
+        slices = []
+        for duration in sample_durations:
+            sample_frames = min(duration * FRAMES_PER_SECOND, longest_frames)
+            slices.append((duration, sample_frames, (longest_frames - sample_frames) // 2))
+        return cls(
+            n_samples=n_samples,
+            longest=longest,
+            middle_offset=max(0, n_samples // 2 - longest // 2),
+            longest_frames=longest_frames,
+            slices=tuple(slices),
+        )
+
+def pick_device_and_compute() -> tuple:
+    """Pick the fastest available device and a compute type it supports well."""
+    import torch
+    
+    if torch.cuda.is_available():
+        # Tensor cores (Volta+/Turing+) run int8 weights with float16 activations
+        major, _ = torch.cuda.get_device_capability()
+        return "cuda", "int8_float16" if major >= 7 else "float16"
+    return "cpu", "int8"
+
+def window_features(out: np.ndarray, mel: "torch.Tensor", offset_frames: int, n_frames: int, pad_value: float):
+    """Copy n_frames of a precomputed mel into one preallocated Whisper window.
+    
+    Padding uses the clip's floor value, which is what zero-padded audio
+    maps to after Whisper's log-mel normalisation.
+    """
+    n_frames = min(n_frames, WINDOW_FRAMES)
+    out[:, :n_frames] = mel.numpy()[:, offset_frames:offset_frames + n_frames]
+    out[:, n_frames:] = pad_value
+
+def detect_language_batch(model, features_batch) -> list:
+    """Detect language for a stack of windows with one encoder pass and one decoder step."""
+    whisper = model
+    encoder_output = whisper.encode(features_batch)
+    detections = []
+    for item in whisper.model.detect_language(encoder_output):
+        lang_token, prob = item[0]
+        detections.append({"language": lang_token[2:-2], "language_probability": prob})
+    return detections
+
+def decode_text(model, features, language: str) -> str:
+    """Encode a single window and decode its text."""
+    from faster_whisper.tokenizer import Tokenizer
+    
+    whisper = model
+    encoder_output = whisper.encode(features[None])
+    tokenizer = Tokenizer(whisper.hf_tokenizer, whisper.model.is_multilingual, task="transcribe", language=language)
+    prompt = whisper.get_prompt(tokenizer, [], without_timestamps=True)
+    result = whisper.model.generate(encoder_output, [prompt], beam_size=5, max_length=448, suppress_blank=True, suppress_tokens=[-1])
+    return tokenizer.decode(result[0].sequences_ids[0]).strip()
+
+def test_language_detection_methods(audio_path: str, sample_durations=[10, 30, 60], warmup: bool = True):
+    """Test different language detection methods and durations.
+    
+    With warmup, one untimed detection runs first so CUDA init and kernel
+    autotuning don't land in the first reported timing.
+    """
+    import whisperx
+    from whisperx.audio import N_SAMPLES, log_mel_spectrogram
+    from quick_language_test import load_whisper_cached
     
     console.print(Panel(
         f"[bold blue]🔍 Language Detection Analysis[/bold blue]\n"
-        f"[dim]Testing file: {Path(audio_path).name}[/dim]",
+        f"[dim]Testing file: {Path(audio_path).name}[/dim]\n"
+        f"[dim]Warm-up: {'on (first call excluded from timings)' if warmup else 'off'}[/dim]",
         title="🧪 Testing",
         border_style="blue"
     ))
@@ -27,54 +116,87 @@ def test_language_detection_methods(audio_path: str, sample_durations=[10, 30, 6
     try:
         # Load audio
         console.print("📁 Loading audio file...")
-        audio = whisperx.load_audio(audio_path)
+        # Contiguous float32 once, so torch.from_numpy in the mel code aliases it
+        audio = np.ascontiguousarray(whisperx.load_audio(audio_path), dtype=np.float32)
         total_duration = len(audio) / 16000
         console.print(f"📊 Total duration: {total_duration:.1f} seconds")
         
         # Load model
         console.print("🤖 Loading Whisper model...")
-        device = "cpu"
-        model = whisperx.load_model("large-v3", device, compute_type="int8")
+        device, compute_type = pick_device_and_compute()
+        console.print(f"[dim]Using {device.upper()} with {compute_type}[/dim]")
+        model = load_whisper_cached("large-v3", device=device, compute_type=compute_type)
         
-        # Test different sample durations
-        results = []
-        for duration in sample_durations:
-            console.print(f"\n🎯 Testing with {duration}s sample...")
-            
-            # Get sample (in samples, not seconds)
-            sample_length = min(duration * 16000, len(audio))
-            audio_sample = audio[:sample_length]
-            
-            # Test from beginning
+        # Compute the mel once for the longest prefix and the longest centred middle
+        # sample; every shorter sample is a slice of these. Whisper only looks at
+        # the first 30s window, so longer samples are capped there.
+        n_mels = model.model.n_mels
+        ctx = AudioContext.build(len(audio), sample_durations)
+        mel_full_start = log_mel_spectrogram(audio[:ctx.longest], n_mels=n_mels, padding=N_SAMPLES)
+        mel_full_middle = log_mel_spectrogram(
+            audio[ctx.middle_offset:ctx.middle_offset + ctx.longest], n_mels=n_mels, padding=N_SAMPLES
+        )
+        start_pad = mel_full_start.min().item()
+        middle_pad = mel_full_middle.min().item()
+        
+        # Fill every (duration, position) window straight into one batch buffer:
+        # start, middle, start, ... (no per-window tensors and no np.stack copy)
+        features_batch = np.empty((2 * len(ctx.slices), n_mels, WINDOW_FRAMES), dtype=np.float32)
+        for i, (_, sample_frames, middle_frame_offset) in enumerate(ctx.slices):
+            window_features(features_batch[2 * i], mel_full_start, 0, sample_frames, start_pad)
+            # Middle is centred, so offset into the longest middle sample
+            window_features(features_batch[2 * i + 1], mel_full_middle, middle_frame_offset, sample_frames, middle_pad)
+        
+        # Untimed pass with the same batch shape as the first timed call
+        if warmup:
+            console.print("🔥 Warming up...")
+            detect_language_batch(model, features_batch[:2])
+        
+        # Shortest duration first (start + middle as a sanity check)
+        console.print(f"\n🎯 Detecting language on the {ctx.slices[0][0]}s samples...")
+        start_time = time.time()
+        detections = detect_language_batch(model, features_batch[:2])
+        detection_times = [time.time() - start_time]
+        
+        if all(d["language_probability"] > CONFIDENT_PROBABILITY for d in detections):
+            console.print(f"[green]⏩ Confident detection (>{CONFIDENT_PROBABILITY:.0%}), skipping longer samples[/green]")
+        elif len(ctx.slices) > 1:
+            console.print(f"🎯 Detecting language on the remaining {len(features_batch) - 2} samples in one batch...")
             start_time = time.time()
-            result_start = model.transcribe(audio_sample)
-            detection_time = time.time() - start_time
-            
-            # Test from middle
-            middle_start = max(0, len(audio) // 2 - sample_length // 2)
-            middle_end = min(len(audio), middle_start + sample_length)
-            audio_middle = audio[middle_start:middle_end]
-            
-            result_middle = model.transcribe(audio_middle)
+            detections += detect_language_batch(model, features_batch[2:])
+            # One batched call covers the rest; report its cost evenly per duration
+            detection_times += [(time.time() - start_time) / (len(ctx.slices) - 1)] * (len(ctx.slices) - 1)
+        
+        # Scatter batch results back to their durations; skipped durations stay None
+        results = []
+        best = None  # (confidence, label, window index) for the transcript preview
+        for i, (duration, _, _) in enumerate(ctx.slices):
+            if 2 * i >= len(detections):
+                results.append(None)
+                continue
+            result_start, result_middle = detections[2 * i], detections[2 * i + 1]
+            console.print(f"\n🎯 {duration}s sample:")
             
             results.append({
                 'duration': duration,
-                'start_lang': result_start.get("language", "unknown"),
-                'start_conf': result_start.get("language_probability", 0.0),
-                'start_text': result_start.get("segments", [{}])[0].get("text", "")[:100] if result_start.get("segments") else "",
-                'middle_lang': result_middle.get("language", "unknown"),
-                'middle_conf': result_middle.get("language_probability", 0.0),
-                'middle_text': result_middle.get("segments", [{}])[0].get("text", "")[:100] if result_middle.get("segments") else "",
-                'detection_time': detection_time
+                'start_lang': result_start["language"],
+                'start_conf': result_start["language_probability"],
+                'middle_lang': result_middle["language"],
+                'middle_conf': result_middle["language_probability"],
+                'detection_time': detection_times[i]
             })
             
+            for offset, label in ((0, f"{duration}s start"), (1, f"{duration}s middle")):
+                detection = detections[2 * i + offset]
+                if best is None or detection["language_probability"] > best[0]:
+                    best = (detection["language_probability"], label, 2 * i + offset)
+            
             console.print(f"  🟢 Beginning: {result_start.get('language', 'unknown')} "
                          f"(conf: {result_start.get('language_probability', 0.0):.1%})")
             console.print(f"  🟡 Middle: {result_middle.get('language', 'unknown')} "
                          f"(conf: {result_middle.get('language_probability', 0.0):.1%})")
         
         # Display results table
-        console.print("\n📋 Detection Results Summary:")
         table = Table(show_header=True, header_style="bold blue")
         table.add_column("Duration", style="cyan")
         table.add_column("Start Lang", style="green")
@@ -84,6 +206,8 @@ def test_language_detection_methods(audio_path: str, sample_durations=[10, 30, 6
         table.add_column("Time", style="dim")
         
         for r in results:
+            if r is None:
+                continue
             table.add_row(
                 f"{r['duration']}s",
                 f"{r['start_lang'].upper()}",
@@ -93,15 +217,17 @@ def test_language_detection_methods(audio_path: str, sample_durations=[10, 30, 6
                 f"{r['detection_time']:.1f}s"
             )
         
-        console.print(table)
+        output = ["\n📋 Detection Results Summary:", table]
         
-        # Show sample transcripts
-        console.print("\n📝 Sample Transcripts:")
-        for r in results:
-            if r['start_text'].strip():
-                console.print(f"[cyan]{r['duration']}s start:[/cyan] {r['start_text']}")
-            if r['middle_text'].strip():
-                console.print(f"[yellow]{r['duration']}s middle:[/yellow] {r['middle_text']}")
+        # Decode text only for the most confident sample
+        if best is not None:
+            _, label, index = best
+            text = decode_text(model, features_batch[index], detections[index]["language"])
+            if text:
+                output.append("\n📝 Sample Transcript (highest confidence):")
+                output.append(f"[cyan]{label}:[/cyan] {text[:100]}")
+        
+        console.print(Group(*output))
         
         return results
         
@@ -110,41 +236,51 @@ def test_language_detection_methods(audio_path: str, sample_durations=[10, 30, 6
         return []
 
 def main():
-    if len(sys.argv) != 2:
-        console.print("[red]Usage: python test_language_detection.py <audio_file>[/red]")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Analyze language detection on an audio file")
+    parser.add_argument("audio", help="Input audio file path")
+    parser.add_argument(
+        "--warmup",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Run one untimed detection before measuring (default: on)"
+    )
+    args = parser.parse_args()
     
-    audio_path = sys.argv[1]
+    audio_path = args.audio
     if not Path(audio_path).exists():
         console.print(f"[red]File not found: {audio_path}[/red]")
         sys.exit(1)
     
     # Test different durations
-    results = test_language_detection_methods(audio_path, [10, 30, 60])
+    results = test_language_detection_methods(audio_path, [10, 30, 60], warmup=args.warmup)
     
+    # Durations skipped after an early confident detection are None
+    results = [r for r in results if r is not None]
     if results:
-        console.print("\n💡 Recommendations:")
+        output = ["\n💡 Recommendations:"]
         
         # Analyze results
         swedish_detections = sum(1 for r in results if r['start_lang'] == 'sv' or r['middle_lang'] == 'sv')
         english_detections = sum(1 for r in results if r['start_lang'] == 'en' or r['middle_lang'] == 'en')
         
         if swedish_detections > english_detections:
-            console.print("[green]✅ Swedish appears to be correctly detected in some samples[/green]")
-            console.print("[yellow]💡 Consider using longer samples or middle portions for detection[/yellow]")
+            output.append("[green]✅ Swedish appears to be correctly detected in some samples[/green]")
+            output.append("[yellow]💡 Consider using longer samples or middle portions for detection[/yellow]")
         elif swedish_detections > 0:
-            console.print("[yellow]⚠️ Mixed results - Swedish detected sometimes[/yellow]")
-            console.print("[yellow]💡 May need multiple sample points for better accuracy[/yellow]")
+            output.append("[yellow]⚠️ Mixed results - Swedish detected sometimes[/yellow]")
+            output.append("[yellow]💡 May need multiple sample points for better accuracy[/yellow]")
         else:
-            console.print("[red]❌ Swedish not detected in any samples[/red]")
-            console.print("[yellow]💡 Consider manual language override or different detection strategy[/yellow]")
+            output.append("[red]❌ Swedish not detected in any samples[/red]")
+            output.append("[yellow]💡 Consider manual language override or different detection strategy[/yellow]")
         
         # Check confidence levels
         high_conf_results = [r for r in results if max(r['start_conf'], r['middle_conf']) > 0.8]
         if high_conf_results:
-            console.print(f"[green]📈 High confidence detections found ({len(high_conf_results)} samples)[/green]")
+            output.append(f"[green]📈 High confidence detections found ({len(high_conf_results)} samples)[/green]")
         else:
-            console.print("[yellow]📉 All detections have low confidence - consider multiple samples[/yellow]")
+            output.append("[yellow]📉 All detections have low confidence - consider multiple samples[/yellow]")
+        
+        console.print(Group(*output))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
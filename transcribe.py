@@ -6,20 +6,85 @@ Transcribes audio files with language detection, alignment, and diarization.
 
 import json
 import os
+import re
 import sys
 import time
 import logging
 import subprocess
+import tempfile
+import threading
+from multiprocessing.connection import Client, Listener
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple, Union
 import argparse
+import fcntl
+from dataclasses import dataclass
+from collections import Counter, defaultdict
 
+
+def physical_core_count() -> int:
+    """Physical cores this process may run on (hyperthread siblings counted once)."""
+    if sys.platform == "darwin":
+        try:
+            return int(subprocess.run(
+                ["sysctl", "-n", "hw.physicalcpu"], capture_output=True, text=True, check=True
+            ).stdout)
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            return os.cpu_count() or 1
+    available = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        smt_active = Path("/sys/devices/system/cpu/smt/active").read_text().strip() == "1"
+    except OSError:
+        smt_active = False
+    return max(1, available // 2 if smt_active else available)
+
+
+# CPU threads for torch, OpenMP/MKL and CTranslate2; an explicit OMP_NUM_THREADS wins.
+# WHISPERX_CPU_SHARE is how many transcription processes split the cores (the
+# watcher's --workers sets it in each worker). Set before torch is imported so
+# its OpenMP pool picks it up.
+CPU_THREADS = int(
+    os.environ.get("OMP_NUM_THREADS")
+    or max(1, physical_core_count() // max(1, int(os.environ.get("WHISPERX_CPU_SHARE") or 1)))
+)
+os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(CPU_THREADS))
+
+import numpy as np
 import whisperx
 import torch
 from dotenv import load_dotenv
 
-# Progress file for daemon communication
+torch.set_num_threads(CPU_THREADS)
+
+# Progress file for daemon communication; every transcription process keeps
+# its own entry, and writers take PROGRESS_LOCK_FILE first
 PROGRESS_FILE = Path.home() / ".whisperx" / "progress.json"
+PROGRESS_LOCK_FILE = PROGRESS_FILE.with_name("progress.lock")
+
+# osascript command lines for send_notification, by sound on/off; the message
+# and title are appended as arguments and read back through argv
+NOTIFY_COMMANDS = {
+    sound: (
+        "osascript",
+        "-e", "on run argv",
+        "-e", "display notification (item 1 of argv) with title (item 2 of argv)"
+              + (' sound name "Glass"' if sound else ""),
+        "-e", "end run",
+    )
+    for sound in (True, False)
+}
+
+# whisperx.asr's per-batch progress line, see whisperx_progress
+_WHISPERX_PROGRESS = re.compile(r"Progress: ([\d.]+)%")
+
+# Minimum time between progress file writes; only the latest update is written
+PROGRESS_FLUSH_INTERVAL = 0.2
+
+# Unix socket of the persistent model server (transcribe.py --serve)
+SERVER_SOCKET = Path.home() / ".whisperx" / "model-server.sock"
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn, TimeRemainingColumn
 from datetime import datetime, timedelta
@@ -58,63 +123,421 @@ ALIGNMENT_MODELS = {
 }
 
 # Supported audio formats
-SUPPORTED_FORMATS = {'.m4a', '.mp4', '.mov', '.wav', '.mp3', '.flac', '.ogg'}
+SUPPORTED_FORMATS = frozenset({'.m4a', '.mp4', '.mov', '.wav', '.mp3', '.flac', '.ogg'})
 
+# Whisper model used for transcription
+TRANSCRIBE_MODEL = "large-v3"
 
-def update_progress(stage: str, percent: float, detail: str = ""):
-    """Update progress file for daemon/menu bar app communication."""
+# Lighter model for the language-detection pass (same encoder size, 4-layer decoder)
+DEFAULT_DETECT_MODEL = "large-v3-turbo"
+
+# CTranslate2 compute types accepted by --compute-type
+COMPUTE_TYPES = ["float32", "float16", "int8_float16", "int8"]
+
+# (minimum free VRAM in GB, batch size), largest first; CPU uses CPU_BATCH_SIZE
+GPU_BATCH_SIZES = [(40, 32), (24, 16), (12, 8)]
+MIN_GPU_BATCH_SIZE = 4
+CPU_BATCH_SIZE = 4
+
+# Decoded audio transcribe_many holds at once, in seconds (float32 at 16 kHz is
+# about 230 MB per hour); it transcribes and releases each group before the next
+MANY_GROUP_SECONDS = 3600
+
+# Single-speaker check: how many loud 1s windows to compare, and the largest
+# separation (in within-cluster standard deviations) that still counts as one
+# voice. The threshold is not calibrated on labelled recordings (with 30
+# windows even one voice often scores above 3), so the check is opt-in via
+# --auto-diarize
+SPEAKER_CHECK_WINDOWS = 30
+SINGLE_SPEAKER_MAX_SEPARATION = 3.0
+
+# Runs diarization alongside alignment; it only needs the audio, not the transcript
+_DIARIZE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarize")
+
+# Loads the alignment model while Whisper is still transcribing
+_ALIGN_LOAD_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="align-load")
+
+# Loaded Whisper pipelines keyed by (arch, device, compute_type, language)
+_MODEL_CACHE: Dict[tuple, Any] = {}
+
+# Loaded (model_a, metadata) alignment models keyed by (language, device)
+_ALIGN_MODEL_CACHE: Dict[tuple, Any] = {}
+
+# Loaded diarization pipelines keyed by (device, hf_token)
+_DIARIZE_MODEL_CACHE: Dict[tuple, Any] = {}
+
+
+def get_or_load_model(
+    device: str,
+    compute_type: str,
+    language: Optional[str] = None,
+    arch: str = TRANSCRIBE_MODEL
+):
+    """Return a cached Whisper pipeline, loading it on first use.
+
+    Load without a language to share one model between detection and
+    transcription; transcribe(language=...) sets the tokenizer per call.
+    """
+    key = (arch, device, compute_type, language)
+    if key not in _MODEL_CACHE:
+        _MODEL_CACHE[key] = whisperx.load_model(
+            arch, device, compute_type=compute_type, language=language, threads=CPU_THREADS
+        )
+    return _MODEL_CACHE[key]
+
+
+def get_or_load_align_model(language: str, device: str):
+    """Return a cached (model_a, metadata) alignment model for a language."""
+    key = (language, device)
+    if key not in _ALIGN_MODEL_CACHE:
+        _ALIGN_MODEL_CACHE[key] = whisperx.load_align_model(
+            language_code=language,
+            device=device,
+            model_name=ALIGNMENT_MODELS.get(language, "WAV2VEC2_ASR_LARGE_LV60K_960H")
+        )
+    return _ALIGN_MODEL_CACHE[key]
+
+
+def default_compute_type(device: str) -> str:
+    """float16 on GPU, CTranslate2's quantized int8 kernels on CPU."""
+    return "float16" if device.startswith("cuda") else "int8"
+
+
+def default_batch_size(device: str) -> int:
+    """Pick a transcription batch size from the VRAM that's free right now."""
+    if not device.startswith("cuda"):
+        return CPU_BATCH_SIZE
+    free_gb = torch.cuda.mem_get_info()[0] / 1024**3
+    for min_free_gb, batch_size in GPU_BATCH_SIZES:
+        if free_gb >= min_free_gb:
+            return batch_size
+    return MIN_GPU_BATCH_SIZE
+
+
+def load_audio_mmap(path: str, sr: int = 16000) -> np.ndarray:
+    """Decode audio with ffmpeg into a file-backed float32 array.
+
+    Same 16kHz mono signal as whisperx.load_audio, but the samples live in
+    an unlinked temp file, so the kernel can page them out between stages
+    instead of keeping the whole decode resident. Copy-on-write, so torch
+    can still wrap it without a read-only warning.
+    """
+    # Under ~/.whisperx rather than /tmp, which may be RAM-backed tmpfs
+    PROGRESS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(suffix=".f32", dir=PROGRESS_FILE.parent) as tmp:
+        cmd = [
+            "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+            "-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(sr), "-y", tmp.name
+        ]
+        try:
+            subprocess.run(cmd, capture_output=True, check=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
+        # The mapping keeps the data alive after the file is unlinked on exit
+        return np.memmap(tmp.name, dtype="<f4", mode="c")
+
+
+# Only shares a decode within one file's run (e.g. detect_language(path) then
+# transcribe_audio(path)); transcribe_audio clears it when it finishes
+@lru_cache(maxsize=2)
+def _decode_audio(path: str, mtime_ns: int, size: int, mmap: bool = False) -> np.ndarray:
+    # mtime and size are only part of the cache key, so a changed file decodes again
+    return load_audio_mmap(path) if mmap else whisperx.load_audio(path)
+
+
+def load_audio_cached(audio_path: str, mmap: bool = False) -> np.ndarray:
+    """Decode audio to 16kHz float32 once per (path, mtime, size) in this process."""
+    path = os.path.abspath(audio_path)
+    st = os.stat(path)
+    return _decode_audio(path, st.st_mtime_ns, st.st_size, mmap)
+
+
+@contextlib.contextmanager
+def whisperx_progress(callback):
+    """Route whisperx.asr's "Progress: N%..." prints to callback(percent).
+
+    FasterWhisperPipeline.transcribe only reports progress through print, so
+    shadow print in that module for the duration; other output passes through.
+    """
+    import builtins
+    import whisperx.asr
+
+    def progress_print(*args, **kwargs):
+        match = _WHISPERX_PROGRESS.match(" ".join(str(arg) for arg in args))
+        if match:
+            callback(float(match.group(1)))
+        else:
+            builtins.print(*args, **kwargs)
+
+    whisperx.asr.print = progress_print
     try:
-        PROGRESS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        progress_data = {
-            "stage": stage,
-            "percent": round(percent, 1),
-            "detail": detail,
-            "timestamp": datetime.now().isoformat()
-        }
-        PROGRESS_FILE.write_text(json.dumps(progress_data))
-    except OSError:
-        pass  # Ignore errors writing progress
+        yield
+    finally:
+        del whisperx.asr.print
 
 
-def clear_progress():
-    """Clear progress file when transcription completes."""
+def likely_single_speaker(audio: np.ndarray, sr: int = 16000) -> bool:
+    """Cheap guess that a recording holds one voice, so diarization can be skipped.
+
+    Takes the long-term spectral envelope (cepstrum of log band energies) of
+    up to SPEAKER_CHECK_WINDOWS loud one-second windows, splits them with
+    2-means and measures how far apart the halves are. Answers False
+    whenever there's too little audio to tell.
+    """
+    n_windows = len(audio) // sr
+    if n_windows < 8:
+        return False
+    windows = np.asarray(audio[:n_windows * sr], dtype=np.float32).reshape(n_windows, sr)
+    rms = np.sqrt(np.einsum("ij,ij->i", windows, windows) / sr)
+    loud = np.flatnonzero(rms > max(1e-3, float(np.median(rms))))
+    if len(loud) < 8:
+        return False
+    picks = loud[np.linspace(0, len(loud) - 1, min(SPEAKER_CHECK_WINDOWS, len(loud))).astype(int)]
+
+    # 25ms frames every 10ms, 24 log-spaced bands over the voice range
+    frames = np.lib.stride_tricks.sliding_window_view(windows[picks], 400, axis=1)[:, ::160]
+    # 1024-point FFT so even the narrowest (lowest) band holds a bin
+    power = np.abs(np.fft.rfft(frames * np.hanning(400), n=1024)) ** 2
+    freqs = np.fft.rfftfreq(1024, 1 / sr)
+    edges = np.geomspace(100, 4000, 25)
+    bands = np.stack([(freqs >= lo) & (freqs < hi) for lo, hi in zip(edges[:-1], edges[1:])], axis=1)
+    log_bands = np.log(power.mean(axis=1) @ bands / bands.sum(axis=0) + 1e-10)
+    # DCT-II without the c0 (loudness) term
+    k = np.arange(1, 13)[:, None]
+    features = log_bands @ np.cos(np.pi * k * (np.arange(24) + 0.5) / 24).T
+    features = (features - features.mean(axis=0)) / (features.std(axis=0) + 1e-8)
+
+    # 2-means, seeded with the window farthest from the mean and the one farthest from that
+    first = features[np.argmax((features ** 2).sum(axis=1))]
+    centroids = np.stack([first, features[np.argmax(((features - first) ** 2).sum(axis=1))]])
+    for _ in range(10):
+        labels = np.argmin(((features[:, None] - centroids) ** 2).sum(axis=2), axis=1)
+        if labels.min() == labels.max():
+            return True
+        centroids = np.stack([features[labels == c].mean(axis=0) for c in (0, 1)])
+
+    # Separation along the line between the centroids
+    axis = centroids[1] - centroids[0]
+    projected = features @ (axis / (np.linalg.norm(axis) + 1e-8))
+    groups = [projected[labels == c] for c in (0, 1)]
+    if min(len(g) for g in groups) < 2:
+        return False
+    spread = np.sqrt((groups[0].var() * len(groups[0]) + groups[1].var() * len(groups[1])) / len(projected))
+    return abs(groups[1].mean() - groups[0].mean()) / (spread + 1e-8) < SINGLE_SPEAKER_MAX_SEPARATION
+
+
+def run_diarization(audio: np.ndarray, device: str, hf_token: Optional[str] = None):
+    """Load the diarization pipeline and run it on the audio.
+
+    Meant to run on _DIARIZE_EXECUTOR; on CUDA it uses its own stream so its
+    kernels can overlap with alignment on the default stream.
+    """
+    stream = torch.cuda.Stream() if device.startswith("cuda") else None
+    with torch.cuda.stream(stream) if stream is not None else contextlib.nullcontext():
+        key = (device, hf_token)
+        if key not in _DIARIZE_MODEL_CACHE:
+            if hf_token:
+                _DIARIZE_MODEL_CACHE[key] = whisperx.diarize.DiarizationPipeline(
+                    use_auth_token=hf_token, 
+                    device=device
+                )
+            else:
+                # Try without token (works for some languages like Swedish)
+                _DIARIZE_MODEL_CACHE[key] = whisperx.diarize.DiarizationPipeline(device=device)
+        diarize_segments = _DIARIZE_MODEL_CACHE[key](audio)
+    if stream is not None:
+        stream.synchronize()
+    return diarize_segments
+
+
+# Latest progress update waiting for the writer thread, guarded by _progress_cv.
+# clear_progress bumps the epoch so an update taken before it is never written.
+_progress_cv = threading.Condition()
+_progress_pending: Optional[dict] = None
+_progress_epoch = 0
+_progress_thread: Optional[threading.Thread] = None
+_progress_write_lock = threading.Lock()
+
+# File this process reports progress for; names its entry in PROGRESS_FILE
+_progress_filename = ""
+
+
+def track_progress(filename: str):
+    """Report later update_progress/clear_progress calls under filename."""
+    global _progress_filename
+    _progress_filename = filename
+
+
+def _pid_alive(pid) -> bool:
+    if not isinstance(pid, int) or pid <= 0:
+        return False
     try:
-        if PROGRESS_FILE.exists():
-            PROGRESS_FILE.unlink()
-    except OSError:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
         pass
+    return True
+
+
+def _edit_progress_file(edit):
+    """Apply edit(files) to PROGRESS_FILE's per-file entries.
+
+    Concurrent transcriptions (the watcher's --workers) share the file, so
+    the read-modify-write holds PROGRESS_LOCK_FILE. Entries of processes
+    that died without clearing are dropped. The top-level fields mirror the
+    most recently updated entry for readers that show a single bar; the
+    file is removed once no entries are left.
+    """
+    PROGRESS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(PROGRESS_LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            files = dict(json.loads(PROGRESS_FILE.read_bytes())["files"])
+        except (OSError, ValueError, KeyError, TypeError):
+            files = {}
+        edit(files)
+        files = {name: entry for name, entry in files.items() if _pid_alive(entry.get("pid"))}
+        if not files:
+            PROGRESS_FILE.unlink(missing_ok=True)
+            return
+        latest = max(files.values(), key=lambda entry: entry["timestamp"])
+        tmp_path = PROGRESS_FILE.with_name(f"{PROGRESS_FILE.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({**latest, "files": files}))
+        os.replace(tmp_path, PROGRESS_FILE)
+
+
+def _progress_writer():
+    """Write the latest progress update at most every PROGRESS_FLUSH_INTERVAL."""
+    global _progress_pending
+    last_written = None  # (epoch, filename, stage, percent, detail)
+    while True:
+        with _progress_cv:
+            while _progress_pending is None:
+                _progress_cv.wait()
+            progress_data, epoch = _progress_pending, _progress_epoch
+            _progress_pending = None
+        
+        # Same stage/percent/detail as the last write since a clear: nothing for the reader to see
+        key = (epoch, progress_data["filename"], progress_data["stage"], progress_data["percent"], progress_data["detail"])
+        if key != last_written:
+            with _progress_write_lock:
+                if epoch == _progress_epoch:
+                    try:
+                        _edit_progress_file(lambda files: files.__setitem__(progress_data["filename"], progress_data))
+                        last_written = key
+                    except OSError:
+                        pass  # Ignore errors writing progress
+        time.sleep(PROGRESS_FLUSH_INTERVAL)
+
+
+def update_progress(stage: str, percent: float, detail: str = ""):
+    """Update progress file for daemon/menu bar app communication.
+    
+    Only records the update; a background thread writes the file.
+    """
+    global _progress_pending, _progress_thread
+    progress_data = {
+        "filename": _progress_filename,
+        "pid": os.getpid(),
+        "stage": stage,
+        "percent": round(percent, 1),
+        "detail": detail,
+        "timestamp": datetime.now().isoformat()
+    }
+    with _progress_cv:
+        _progress_pending = progress_data
+        if _progress_thread is None:
+            _progress_thread = threading.Thread(target=_progress_writer, name="progress-writer", daemon=True)
+            _progress_thread.start()
+        _progress_cv.notify()
+
+
+def clear_progress():
+    """Remove this process's progress entry when its transcription completes.
+
+    Entries of other processes' transcriptions are left alone.
+    """
+    global _progress_pending, _progress_epoch
+    with _progress_cv:
+        _progress_pending = None
+        _progress_epoch += 1
+        filename = _progress_filename
+    with _progress_write_lock:
+        try:
+            _edit_progress_file(lambda files: files.pop(filename, None))
+        except OSError:
+            pass
 
 
 def send_notification(title: str, message: str, sound: bool = True):
-    """Send macOS notification using osascript."""
+    """Send macOS notification using osascript, without waiting for it."""
     try:
-        sound_param = "with sound name \"Glass\"" if sound else ""
-        script = f'''
-        display notification "{message}" with title "{title}" {sound_param}
-        '''
-        subprocess.run(['osascript', '-e', script], check=True, capture_output=True)
-    except subprocess.CalledProcessError as e:
+        # Text goes in as script arguments, so it never needs escaping
+        subprocess.Popen(
+            [*NOTIFY_COMMANDS[sound], message, title],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    except OSError as e:
         logger.error(f"Failed to send notification: {e}")
 
 
-def detect_language(audio_path: str, device: str = "cpu") -> Tuple[str, float]:
+def _detect_samples_batched(model, samples: list) -> list:
+    """Detect language for several audio samples in one batch.
+
+    Each sample contributes its first 30s window (what whisperx's own
+    detection looks at). All windows share one encoder pass and a single
+    detect_language decoder step; no text is generated. Returns
+    [(language_code, probability), ...] in sample order.
+    """
+    from whisperx.audio import N_SAMPLES, log_mel_spectrogram
+
+    whisper = model.model
+    n_mels = whisper.model.n_mels
+    features = np.stack([
+        log_mel_spectrogram(
+            sample[:N_SAMPLES], n_mels=n_mels, padding=max(0, N_SAMPLES - len(sample))
+        ).numpy()[:, :3000]
+        for sample in samples
+    ])
+    encoder_output = whisper.encode(features)
+
+    # Each item is [(token, probability), ...] sorted best first, tokens like "<|sv|>"
+    return [
+        (item[0][0][2:-2], item[0][1])
+        for item in whisper.model.detect_language(encoder_output)
+    ]
+
+
+def detect_language(
+    audio: Union[str, np.ndarray],
+    device: str = "cpu",
+    model=None,
+    detect_model: str = DEFAULT_DETECT_MODEL
+) -> Tuple[str, float]:
     """
-    Detect the language of the audio file using WhisperX with improved multi-sample detection.
+    Detect the language of the audio using WhisperX with improved multi-sample detection.
+    Accepts a file path or already-decoded 16kHz audio, and an optional preloaded model;
+    without one, the lighter detect_model is loaded.
     Returns (language_code, confidence_score)
     """
     console.print("🔍 Starting enhanced language detection...")
     update_progress("detecting", 5, "Starting language detection")
 
     try:
-        # Load audio
-        console.print("📁 Loading audio file...")
-        audio = whisperx.load_audio(audio_path)
+        # Load audio unless the caller already decoded it
+        if isinstance(audio, (str, Path)):
+            console.print("📁 Loading audio file...")
+            audio = load_audio_cached(str(audio))
         total_duration = len(audio) / 16000
         console.print(f"📊 Audio duration: {total_duration:.1f} seconds")
         
-        # Load model for language detection
-        console.print("🤖 Loading Whisper model for language detection...")
-        model = whisperx.load_model("large-v3", device, compute_type="int8")
+        # Load model for language detection unless one was passed in
+        if model is None:
+            console.print(f"🤖 Loading {detect_model} for language detection...")
+            model = get_or_load_model(device, "int8", arch=detect_model)
         
         detection_results = []
         sample_positions = []
@@ -139,78 +562,58 @@ def detect_language(audio_path: str, device: str = "cpu") -> Tuple[str, float]:
         
         console.print(f"🎯 Testing {len(sample_positions)} audio samples...")
 
-        # Test each sample
-        for idx, (start_time, end_time, position) in enumerate(sample_positions):
-            update_progress("detecting", 8 + (idx * 4), f"Analyzing {position} sample")
+        # Slice every sample up front so they can run as one batch
+        samples = []
+        for start_time, end_time, position in sample_positions:
             start_sample = int(start_time * 16000)
             end_sample = int(end_time * 16000)
             
             # Ensure we don't exceed audio bounds
             start_sample = max(0, min(start_sample, len(audio) - 1000))
             end_sample = min(len(audio), max(start_sample + 1000, end_sample))
-            
-            audio_sample = audio[start_sample:end_sample]
+            samples.append(audio[start_sample:end_sample])
+        
+        update_progress("detecting", 8, f"Analyzing {len(samples)} samples")
+        console.print(f"  🎵 Analyzing {', '.join(p for _, _, p in sample_positions)} in one batch...")
+        with contextlib.redirect_stdout(None), contextlib.redirect_stderr(None):
+            batch_results = _detect_samples_batched(model, samples)
+        
+        # Split batch results back out per sample for the voting below
+        for (_, _, position), audio_sample, (detected_lang, probability) in zip(sample_positions, samples, batch_results):
             sample_duration = len(audio_sample) / 16000
             
-            console.print(f"  🎵 Analyzing {position} ({sample_duration:.1f}s sample)...")
-            
-            # Transcribe sample - let WhisperX handle language detection internally
-            with contextlib.redirect_stdout(None), contextlib.redirect_stderr(None):
-                result = model.transcribe(audio_sample)
-            
-            detected_lang = result.get("language", "unknown")
-            
-            # WhisperX doesn't reliably return language_probability in result dict
-            # We'll infer confidence from the text quality and detection consistency
-            segments = result.get("segments", [])
-            text_length = sum(len(seg.get("text", "").strip()) for seg in segments)
-            
-            # Estimate confidence based on text length and detection consistency
-            confidence_estimate = min(0.9, text_length / 50.0) if text_length > 0 else 0.1
-            
+            # Whisper's own language-token probability for this sample
             detection_results.append({
                 'language': detected_lang,
-                'confidence': confidence_estimate,
+                'confidence': probability,
                 'position': position,
-                'text_length': text_length,
-                'sample_duration': sample_duration,
-                'text_sample': segments[0].get("text", "")[:100] if segments else ""
+                'sample_duration': sample_duration
             })
             
-            console.print(f"    → {detected_lang.upper()} (text length: {text_length})")
+            console.print(f"    → {position}: {detected_lang.upper()} (probability: {probability:.1%})")
         
         # Analyze results to determine best language
-        language_votes = {}
-        total_confidence = 0
-        
+        votes = Counter(result['language'] for result in detection_results)
+        confidence_sum = defaultdict(float)
         for result in detection_results:
-            lang = result['language']
-            conf = result['confidence']
-            
-            if lang not in language_votes:
-                language_votes[lang] = {'count': 0, 'total_confidence': 0, 'results': []}
-            
-            language_votes[lang]['count'] += 1
-            language_votes[lang]['total_confidence'] += conf
-            language_votes[lang]['results'].append(result)
-            total_confidence += conf
+            confidence_sum[result['language']] += result['confidence']
+        avg_confidence = {lang: confidence_sum[lang] / count for lang, count in votes.items()}
         
         # Find the most likely language
         best_language = "en"  # default
         best_score = 0
         
-        for lang, data in language_votes.items():
+        for lang, count in votes.items():
             # Score = vote count + average confidence
-            avg_confidence = data['total_confidence'] / data['count']
-            score = data['count'] * 2 + avg_confidence  # Weight vote count more heavily
+            score = count * 2 + avg_confidence[lang]  # Weight vote count more heavily
             
             if score > best_score and lang != "unknown":
                 best_language = lang
                 best_score = score
         
         # Calculate overall confidence
-        if best_language in language_votes:
-            final_confidence = min(0.95, language_votes[best_language]['total_confidence'] / language_votes[best_language]['count'])
+        if best_language in votes:
+            final_confidence = min(0.95, avg_confidence[best_language])
         else:
             final_confidence = 0.1
         
@@ -219,15 +622,15 @@ def detect_language(audio_path: str, device: str = "cpu") -> Tuple[str, float]:
         results_table = Table(show_header=True, header_style="bold blue")
         results_table.add_column("Sample", style="cyan")
         results_table.add_column("Language", style="green") 
-        results_table.add_column("Text Length", style="yellow")
-        results_table.add_column("Sample Text", style="dim")
+        results_table.add_column("Probability", style="yellow")
+        results_table.add_column("Duration", style="dim")
         
         for result in detection_results:
             results_table.add_row(
                 result['position'].title(),
                 result['language'].upper(),
-                str(result['text_length']),
-                result['text_sample'][:50] + "..." if len(result['text_sample']) > 50 else result['text_sample']
+                f"{result['confidence']:.1%}",
+                f"{result['sample_duration']:.0f}s"
             )
         
         console.print(results_table)
@@ -237,10 +640,10 @@ def detect_language(audio_path: str, device: str = "cpu") -> Tuple[str, float]:
         console.print(f"\n✅ Final detection: {flag} {best_language.upper()} (confidence: {final_confidence:.1%})")
         
         # Show vote breakdown
-        if len(language_votes) > 1:
+        if len(votes) > 1:
             console.print("🗳️ Vote breakdown:")
-            for lang, data in sorted(language_votes.items(), key=lambda x: x[1]['count'], reverse=True):
-                console.print(f"  • {lang.upper()}: {data['count']} votes (avg conf: {data['total_confidence']/data['count']:.1%})")
+            for lang, count in votes.most_common():
+                console.print(f"  • {lang.upper()}: {count} votes (avg conf: {avg_confidence[lang]:.1%})")
         
         # Warnings and suggestions for low confidence
         if final_confidence < 0.4:
@@ -255,10 +658,9 @@ def detect_language(audio_path: str, device: str = "cpu") -> Tuple[str, float]:
             console.print("[yellow]🤔 Detected Portuguese, but Swedish was also found in samples[/yellow]")
             console.print("[yellow]💡 If this is Swedish audio, use: -l sv[/yellow]")
         
-        # Check for sparse content (might miss actual language)
-        total_text_length = sum(r['text_length'] for r in detection_results)
-        if total_text_length < 20:  # Very little text found
-            console.print("[yellow]⚠️ Very sparse speech content detected in samples[/yellow]")
+        # No sample is sure of its language - often sparse speech or music
+        if all(r['confidence'] < 0.5 for r in detection_results):
+            console.print("[yellow]⚠️ No sample was detected with confidence - speech may be sparse[/yellow]")
             console.print("[yellow]💡 Language detection may be unreliable with sparse audio[/yellow]")
             console.print("[dim]   Consider using manual language specification: -l sv or -l en[/dim]")
         
@@ -305,14 +707,29 @@ def transcribe_audio(
     device: str = "cpu",
     language: Optional[str] = None,
     diarize: bool = True,
-    output_formats: list = None
+    output_formats: list = None,
+    detect_model: str = DEFAULT_DETECT_MODEL,
+    compute_type: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    mmap_audio: bool = False,
+    transcript: Optional[Dict] = None,
+    auto_diarize: bool = False,
+    audio: Optional[np.ndarray] = None
 ) -> Dict:
     """
     Transcribe audio file with WhisperX including alignment and diarization.
+    
+    A transcript ({"segments", "language"} from Whisper) skips detection and
+    transcription and only runs alignment, diarization and saving; audio
+    (the already-decoded 16kHz signal) skips decoding.
+    With auto_diarize set, diarization is skipped when the audio sounds like
+    a single speaker.
     """
     # Default to just TXT output, but allow override
     if output_formats is None:
         output_formats = ['txt']
+    if compute_type is None:
+        compute_type = default_compute_type(device)
     
     start_time = time.time()
     audio_name = Path(audio_path).stem
@@ -322,6 +739,7 @@ def transcribe_audio(
     console.rule(f"[bold blue]🎙️ Transcribing: {audio_name}")
     console.print()
 
+    track_progress(Path(audio_path).name)
     update_progress("loading", 0, f"Starting: {audio_name}")
 
     try:
@@ -343,7 +761,8 @@ def transcribe_audio(
             # Load audio
             progress.update(main_task, description="📁 Loading audio file...", advance=10, eta="Calculating...")
             update_progress("loading", 10, "Loading audio file")
-            audio = whisperx.load_audio(audio_path)
+            if audio is None:
+                audio = load_audio_cached(audio_path, mmap=mmap_audio)
             
             # Get audio duration for better progress tracking
             duration = len(audio) / 16000  # WhisperX uses 16kHz
@@ -352,85 +771,104 @@ def transcribe_audio(
             # Track the actual processing pace
             progress_start_time = time.time()
             
-            # Detect language if not provided
-            if language is None:
-                current_progress = progress.tasks[main_task].completed + 5
-                eta = calculate_eta(progress_start_time, current_progress)
-                progress.update(main_task, description="🔍 Detecting language...", advance=5, eta=eta)
-                language, confidence = detect_language(audio_path, device)
-                if confidence < 0.5:
-                    console.print("[yellow]⚠️ Low confidence language detection[/yellow]")
+            if transcript is not None:
+                # Whisper already ran for this file as part of transcribe_many's batch
+                language = transcript["language"]
+                result = transcript
+                align_future = _ALIGN_LOAD_EXECUTOR.submit(get_or_load_align_model, language, device)
+                progress.update(main_task, description=f"🌍 Using batched transcript ({language.upper()})", completed=100)
+                update_progress("transcribing", 60, "Transcription complete")
             else:
-                # Skip language detection, advance progress
-                current_progress = progress.tasks[main_task].completed + 5
-                eta = calculate_eta(progress_start_time, current_progress)
-                progress.update(main_task, description=f"🌍 Using specified language: {language.upper()}...", advance=5, eta=eta)
+                # Detect language if not provided
+                if language is None:
+                    current_progress = progress.tasks[main_task].completed + 5
+                    eta = calculate_eta(progress_start_time, current_progress)
+                    progress.update(main_task, description="🔍 Detecting language...", advance=5, eta=eta)
+                    # Reuse the transcription model if it's already loaded, otherwise
+                    # use the lighter detector; either way pass the decoded audio
+                    loaded = _MODEL_CACHE.get((TRANSCRIBE_MODEL, device, compute_type, None))
+                    language, confidence = detect_language(audio, device, model=loaded, detect_model=detect_model)
+                    if confidence < 0.5:
+                        console.print("[yellow]⚠️ Low confidence language detection[/yellow]")
+                else:
+                    # Skip language detection, advance progress
+                    current_progress = progress.tasks[main_task].completed + 5
+                    eta = calculate_eta(progress_start_time, current_progress)
+                    progress.update(main_task, description=f"🌍 Using specified language: {language.upper()}...", advance=5, eta=eta)
             
-            # Load transcription model
-            current_progress = progress.tasks[main_task].completed + 15
-            eta = calculate_eta(progress_start_time, current_progress)
-            progress.update(main_task, description=f"🤖 Loading Whisper model ({language.upper()})...", advance=15, eta=eta)
-            update_progress("loading", 25, f"Loading Whisper model ({language.upper()})")
-            model = whisperx.load_model("large-v3", device, compute_type="float32", language=language)
+                # Load transcription model
+                current_progress = progress.tasks[main_task].completed + 15
+                eta = calculate_eta(progress_start_time, current_progress)
+                progress.update(main_task, description=f"🤖 Loading Whisper model ({language.upper()})...", advance=15, eta=eta)
+                update_progress("loading", 25, f"Loading Whisper model ({language.upper()})")
+                model = get_or_load_model(device, compute_type)
             
-            # Transcribe (pass language explicitly to avoid WhisperX auto-detection)
-            current_progress = progress.tasks[main_task].completed + 10
-            eta = calculate_eta(progress_start_time, current_progress)
-            progress.update(main_task, description="🎯 Starting transcription...", advance=10, eta=eta)
+                # Transcribe (pass language explicitly to avoid WhisperX auto-detection)
+                current_progress = progress.tasks[main_task].completed + 10
+                eta = calculate_eta(progress_start_time, current_progress)
+                progress.update(main_task, description="🎯 Starting transcription...", advance=10, eta=eta)
             
-        # Exit progress context for transcription to show WhisperX progress clearly
-        console.print(f"[dim]⚡ Transcription phase - WhisperX batch progress:[/dim]")
+                update_progress("transcribing", 30, "Transcribing audio...")
 
-        update_progress("transcribing", 30, "Transcribing audio...")
-        transcribe_start = time.time()
+                # Size the batch after the model is loaded so its weights are already counted
+                suggested_batch_size = default_batch_size(device)
+                if batch_size is None:
+                    batch_size = suggested_batch_size
+                elif batch_size > suggested_batch_size and device.startswith("cuda"):
+                    console.print(f"[yellow]⚠️ Batch size {batch_size} is above the {suggested_batch_size} suggested for free VRAM - may run out of memory[/yellow]")
+                console.print(f"[dim]📦 Batch size: {batch_size}[/dim]")
 
-        # Enable WhisperX built-in progress display (outside progress context)
-        result = model.transcribe(
-            audio,
-            batch_size=8,
-            language=language,
-            print_progress=True,
-            combined_progress=True
-        )
+                # Language is known now, so load the alignment model during transcription
+                align_future = _ALIGN_LOAD_EXECUTOR.submit(get_or_load_align_model, language, device)
+                progress.update(main_task, description="✅ Ready to transcribe", completed=100)
+                transcribe_task = progress.add_task("⚡ Transcribing...", total=100, eta="Calculating...")
+                transcribe_start = time.time()
 
-        transcribe_elapsed = time.time() - transcribe_start
-        actual_speed = duration / transcribe_elapsed if transcribe_elapsed > 0 else 0
-        console.print(f"[green]✅ Transcription complete: {actual_speed:.1f}x realtime speed[/green]")
-        console.print()
-        update_progress("transcribing", 60, "Transcription complete")
-        
-        # Create output directories and initialize variables before progress context
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        base_filename = output_path / audio_name
-        saved_files = []
+                def on_transcribe_progress(percent: float):
+                    progress.update(transcribe_task, completed=percent, eta=calculate_eta(transcribe_start, percent))
+                    update_progress("transcribing", 30 + percent * 0.3, f"Transcribing audio ({percent:.0f}%)")
 
-        # Resume with new progress context for remaining steps
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            TimeElapsedColumn(),
-            TimeRemainingColumn(),
-            TextColumn("[dim]ETA: {task.fields[eta]}[/dim]"),
-            console=console,
-            transient=False
-        ) as progress:
+                # WhisperX's per-chunk progress drives the transcription bar
+                with whisperx_progress(on_transcribe_progress):
+                    result = model.transcribe(
+                        audio,
+                        batch_size=batch_size,
+                        language=language,
+                        print_progress=True,
+                        combined_progress=False
+                    )
+
+                transcribe_elapsed = time.time() - transcribe_start
+                actual_speed = duration / transcribe_elapsed if transcribe_elapsed > 0 else 0
+                progress.update(transcribe_task, description="✅ Transcribed", completed=100, eta="Done")
+                console.print(f"[green]✅ Transcription complete: {actual_speed:.1f}x realtime speed[/green]")
+                update_progress("transcribing", 60, "Transcription complete")
+            
+            # Create output directories and initialize variables
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+            base_filename = output_path / audio_name
+            saved_files = []
 
+            # Post-processing gets its own task in the same Progress display
             main_task = progress.add_task("🔗 Post-processing...", total=100, eta="Calculating...")
-            progress.update(main_task, completed=0)  # Start fresh for remaining steps
 
-            # Load alignment model
-            alignment_model_name = ALIGNMENT_MODELS.get(language, "WAV2VEC2_ASR_LARGE_LV60K_960H")
+            if diarize and auto_diarize and likely_single_speaker(audio):
+                console.print("👤 Sounds like a single speaker - skipping speaker diarization")
+                logger.info(f"Skipped diarization for {audio_name}: single speaker likely")
+                diarize = False
+
+            # Start diarization in the background; it's joined before assigning speakers
+            if diarize:
+                hf_token = os.getenv("HF_TOKEN")
+                console.print(f"[dim]🕐 Speaker diarization estimate: {duration*0.2:.0f}-{duration*0.5:.0f}s (running alongside alignment)[/dim]")
+                diarize_start = time.time()
+                diarize_future = _DIARIZE_EXECUTOR.submit(run_diarization, audio, device, hf_token)
+
+            # Alignment model was loading in the background during transcription
             progress.update(main_task, description=f"🔗 Loading alignment model...", advance=5)
             update_progress("aligning", 65, "Loading alignment model")
-
-            model_a, metadata = whisperx.load_align_model(
-                language_code=language,
-                device=device,
-                model_name=alignment_model_name
-            )
+            model_a, metadata = align_future.result()
 
             # Align whisper output
             progress.update(main_task, description="⚡ Aligning transcription...", advance=10)
@@ -450,33 +888,20 @@ def transcribe_audio(
                 progress.update(main_task, description="💾 Saving intermediate transcript...", advance=2)
                 raw_txt_file = f"{base_filename}_raw.txt"
                 with open(raw_txt_file, "w", encoding="utf-8") as f:
-                    for segment in result["segments"]:
-                        f.write(f"{segment['text'].strip()}\n")
+                    f.write("".join(f"{segment['text'].strip()}\n" for segment in result["segments"]))
                 saved_files.append(raw_txt_file)
                 console.print(f"💾 Saved intermediate transcript: [dim]{raw_txt_file}[/dim]")
             
             # Diarization (speaker identification)
             if diarize:
-                hf_token = os.getenv("HF_TOKEN")
-                # Try diarization without token first, fallback with warning if needed
+                # Diarization was tried without a token unless HF_TOKEN is set; warn if it failed
                 try:
                     current_progress = progress.tasks[main_task].completed + 5
                     eta = calculate_eta(progress_start_time, current_progress)
                     progress.update(main_task, description="👥 Identifying speakers...", advance=5, eta=eta)
                     update_progress("diarization", 75, "Identifying speakers")
 
-                    console.print(f"[dim]🕐 Speaker diarization estimate: {duration*0.2:.0f}-{duration*0.5:.0f}s[/dim]")
-                    diarize_start = time.time()
-                    if hf_token:
-                        diarize_model = whisperx.diarize.DiarizationPipeline(
-                            use_auth_token=hf_token, 
-                            device=device
-                        )
-                    else:
-                        # Try without token (works for some languages like Swedish)
-                        diarize_model = whisperx.diarize.DiarizationPipeline(device=device)
-                    
-                    diarize_segments = diarize_model(audio)
+                    diarize_segments = diarize_future.result()
                     result = whisperx.assign_word_speakers(diarize_segments, result)
                     
                     diarize_elapsed = time.time() - diarize_start
@@ -502,63 +927,27 @@ def transcribe_audio(
             if any(fmt != 'txt' for fmt in output_formats):
                 formats_dir.mkdir(parents=True, exist_ok=True)
 
-            # Count segments for progress
+            # One pass over the segments for every format and the speaker count
             num_segments = len(result["segments"])
             console.print(f"📝 Found {num_segments} segments to save")
+            columns = SegmentColumns.from_result(result, diarize)
 
-            # Save files in requested formats
+            # Save files in requested formats, one writer thread per file
             progress_per_format = 10 // len(output_formats)  # Distribute 10% across formats
-            
-            for fmt in output_formats:
-                if fmt == 'txt':
-                    progress.update(main_task, description="💾 Saving TXT format...", advance=progress_per_format)
-                    txt_file = f"{base_filename}.txt"
-                    with open(txt_file, "w", encoding="utf-8") as f:
-                        for segment in result["segments"]:
-                            speaker = f"[{segment.get('speaker', 'UNKNOWN')}] " if diarize else ""
-                            f.write(f"{speaker}{segment['text'].strip()}\n")
-                    saved_files.append(txt_file)
-                
-                elif fmt == 'json':
-                    progress.update(main_task, description="💾 Saving JSON format...", advance=progress_per_format)
-                    import json
-                    json_file = formats_dir / f"{audio_name}.json"
-                    with open(json_file, "w", encoding="utf-8") as f:
-                        json.dump(result, f, indent=2, ensure_ascii=False)
-                    saved_files.append(str(json_file))
-                
-                elif fmt == 'srt':
-                    progress.update(main_task, description="💾 Saving SRT format...", advance=progress_per_format)
-                    srt_file = formats_dir / f"{audio_name}.srt"
-                    with open(srt_file, "w", encoding="utf-8") as f:
-                        for i, segment in enumerate(result["segments"], 1):
-                            start_time_srt = format_time_srt(segment["start"])
-                            end_time_srt = format_time_srt(segment["end"])
-                            speaker = f"[{segment.get('speaker', 'UNKNOWN')}] " if diarize else ""
-                            f.write(f"{i}\n{start_time_srt} --> {end_time_srt}\n{speaker}{segment['text'].strip()}\n\n")
-                    saved_files.append(str(srt_file))
-                
-                elif fmt == 'vtt':
-                    progress.update(main_task, description="💾 Saving VTT format...", advance=progress_per_format)
-                    vtt_file = formats_dir / f"{audio_name}.vtt"
-                    with open(vtt_file, "w", encoding="utf-8") as f:
-                        f.write("WEBVTT\n\n")
-                        for segment in result["segments"]:
-                            start_time_vtt = format_time_vtt(segment["start"])
-                            end_time_vtt = format_time_vtt(segment["end"])
-                            speaker = f"[{segment.get('speaker', 'UNKNOWN')}] " if diarize else ""
-                            f.write(f"{start_time_vtt} --> {end_time_vtt}\n{speaker}{segment['text'].strip()}\n\n")
-                    saved_files.append(str(vtt_file))
-                
-                elif fmt == 'tsv':
-                    progress.update(main_task, description="💾 Saving TSV format...", advance=progress_per_format)
-                    tsv_file = formats_dir / f"{audio_name}.tsv"
-                    with open(tsv_file, "w", encoding="utf-8") as f:
-                        f.write("start\tend\tspeaker\ttext\n")
-                        for segment in result["segments"]:
-                            speaker = segment.get('speaker', 'UNKNOWN') if diarize else 'SPEAKER_00'
-                            f.write(f"{segment['start']:.3f}\t{segment['end']:.3f}\t{speaker}\t{segment['text'].strip()}\n")
-                    saved_files.append(str(tsv_file))
+            output_files = {
+                fmt: f"{base_filename}.txt" if fmt == 'txt' else str(formats_dir / f"{audio_name}.{fmt}")
+                for fmt in output_formats
+            }
+            progress.update(main_task, description=f"💾 Saving {', '.join(fmt.upper() for fmt in output_formats)}...")
+            with ThreadPoolExecutor(max_workers=len(output_formats), thread_name_prefix="save") as executor:
+                futures = {
+                    executor.submit(FORMAT_WRITERS[fmt], output_files[fmt], result, columns): fmt
+                    for fmt in output_files
+                }
+                for future in as_completed(futures):
+                    future.result()
+                    progress.update(main_task, description=f"💾 Saved {futures[future].upper()} format", advance=progress_per_format)
+            saved_files.extend(output_files.values())
             
             # Complete the progress
             progress.update(main_task, description="✅ Transcription complete!", completed=100)
@@ -569,11 +958,8 @@ def transcribe_audio(
         # Display success summary
         console.print()
         
-        # Count speakers
-        speakers = set()
-        if diarize and result.get("segments"):
-            speakers = {seg.get('speaker') for seg in result["segments"] if seg.get('speaker')}
-            speakers.discard(None)
+        # Speakers were collected while preparing the output columns
+        speakers = columns.speakers
         
         # Create success table
         table = Table(title="🎉 Transcription Results", show_header=True, header_style="bold blue")
@@ -607,7 +993,8 @@ def transcribe_audio(
             "status": "success",
             "language": language,
             "processing_time": processing_time,
-            "output_files": saved_files
+            "output_files": saved_files,
+            "speaker_count": len(speakers) if diarize else 0
         }
         
     except Exception as e:
@@ -641,6 +1028,302 @@ def transcribe_audio(
             "error": str(e),
             "processing_time": processing_time
         }
+    finally:
+        # A finished file isn't decoded again, so don't pin its signal in a
+        # long-lived worker or server process
+        _decode_audio.cache_clear()
+
+
+def _transcribe_batched(model, audios: list, language: str, batch_size: int, chunk_size: int = 30) -> list:
+    """Transcribe several audios in one stream of Whisper batches.
+
+    Mirrors FasterWhisperPipeline.transcribe, except the VAD chunks of every
+    file go through a single pipeline call, so short files fill batches
+    together. Chunks are tagged with their file index to split the output
+    back up. Returns one {"segments", "language"} result per audio.
+    """
+    from faster_whisper.tokenizer import Tokenizer
+    from whisperx.audio import SAMPLE_RATE
+    from whisperx.vads import Pyannote, Vad
+
+    if isinstance(model.vad_model, Vad):
+        preprocess, merge_chunks = model.vad_model.preprocess_audio, model.vad_model.merge_chunks
+    else:
+        preprocess, merge_chunks = Pyannote.preprocess_audio, Pyannote.merge_chunks
+    
+    chunks = []  # (audio index, vad segment) in pipeline order
+    for index, audio in enumerate(audios):
+        vad_segments = model.vad_model({"waveform": preprocess(audio), "sample_rate": SAMPLE_RATE})
+        vad_segments = merge_chunks(
+            vad_segments, chunk_size, onset=model._vad_params["vad_onset"], offset=model._vad_params["vad_offset"]
+        )
+        chunks.extend((index, segment) for segment in vad_segments)
+    
+    def data():
+        for index, segment in chunks:
+            yield {"inputs": audios[index][int(segment["start"] * SAMPLE_RATE):int(segment["end"] * SAMPLE_RATE)]}
+    
+    results = [{"segments": [], "language": language} for _ in audios]
+    previous_tokenizer = model.tokenizer
+    model.tokenizer = Tokenizer(
+        model.model.hf_tokenizer, model.model.model.is_multilingual, task="transcribe", language=language
+    )
+    try:
+        for (index, segment), out in zip(chunks, model(data(), batch_size=batch_size, num_workers=0)):
+            text = out["text"]
+            if batch_size in (0, 1, None):
+                text = text[0]
+            results[index]["segments"].append(
+                {"text": text, "start": round(segment["start"], 3), "end": round(segment["end"], 3)}
+            )
+    finally:
+        model.tokenizer = previous_tokenizer
+    return results
+
+
+def transcribe_many(
+    audio_paths: list,
+    output_dir: str,
+    device: str = "cpu",
+    language: Optional[str] = None,
+    diarize: bool = True,
+    output_formats: list = None,
+    detect_model: str = DEFAULT_DETECT_MODEL,
+    compute_type: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    mmap_audio: bool = False,
+    auto_diarize: bool = False
+) -> list:
+    """Transcribe several files, batching Whisper across files of a language.
+
+    Files are decoded and detected in order into groups of up to
+    MANY_GROUP_SECONDS of audio; files in a group that share a language are
+    transcribed together, then each goes through transcribe_audio for
+    alignment, diarization and saving, and the group is released before the
+    next one is decoded. Returns transcribe_audio's result per file.
+    """
+    if compute_type is None:
+        compute_type = default_compute_type(device)
+    
+    console.print(f"📚 Batch transcription of {len(audio_paths)} files")
+    results: list = [None] * len(audio_paths)
+    group: list = []  # (index, audio, language) of decoded files not yet transcribed
+    group_seconds = 0.0
+    
+    def run_group():
+        nonlocal batch_size
+        model = get_or_load_model(device, compute_type)
+        if batch_size is None:
+            batch_size = default_batch_size(device)
+        
+        by_language = defaultdict(list)
+        for position, (_, _, lang) in enumerate(group):
+            by_language[lang].append(position)
+        
+        transcripts: list = [None] * len(group)
+        for lang, positions in by_language.items():
+            console.print(f"⚡ Transcribing {len(positions)} {lang.upper()} file(s) in shared batches of {batch_size}...")
+            try:
+                batched = _transcribe_batched(model, [group[i][1] for i in positions], lang, batch_size)
+            except Exception as e:
+                # Leave these to transcribe_audio's own per-file path
+                logger.error(f"Batched transcription failed for {lang}: {e}")
+                console.print(f"[yellow]⚠️ Batched transcription failed ({str(e)[:100]}), falling back to per-file[/yellow]")
+                continue
+            for position, result in zip(positions, batched):
+                transcripts[position] = result
+        
+        for position, (index, audio, lang) in enumerate(group):
+            results[index] = transcribe_audio(
+                audio_path=audio_paths[index],
+                output_dir=output_dir,
+                device=device,
+                language=lang,
+                diarize=diarize,
+                output_formats=output_formats,
+                detect_model=detect_model,
+                compute_type=compute_type,
+                batch_size=batch_size,
+                mmap_audio=mmap_audio,
+                transcript=transcripts[position],
+                auto_diarize=auto_diarize,
+                audio=audio
+            )
+            # Done with this file; don't hold its signal while the rest finish
+            group[position] = transcripts[position] = None
+        group.clear()
+    
+    for index, path in enumerate(audio_paths):
+        # A file that can't be decoded or detected fails alone; the rest carry on
+        track_progress(Path(path).name)
+        try:
+            audio = load_audio_cached(path, mmap=mmap_audio)
+            lang = language
+            if lang is None:
+                lang = detect_language(
+                    audio, device, model=_MODEL_CACHE.get((TRANSCRIBE_MODEL, device, compute_type, None)),
+                    detect_model=detect_model
+                )[0]
+        except Exception as e:
+            logger.error(f"Transcription failed for {Path(path).stem}: {e}")
+            console.print(f"[red]❌ Skipping {Path(path).name}: {str(e)[:200]}[/red]")
+            results[index] = {"status": "error", "error": str(e), "processing_time": 0.0}
+            continue
+        finally:
+            clear_progress()  # transcribe_audio reports this file again once it's running
+        
+        group.append((index, audio, lang))
+        group_seconds += len(audio) / 16000
+        del audio
+        if group_seconds >= MANY_GROUP_SECONDS:
+            run_group()
+            group_seconds = 0.0
+    
+    if group:
+        run_group()
+    return results
+
+
+class WhisperXSession:
+    """Holds one set of transcription settings and keeps their models loaded.
+
+    Models live in the module caches, so every transcribe() after the first
+    skips loading Whisper, the alignment model and the diarization pipeline.
+    """
+
+    def __init__(
+        self,
+        device: str = "cpu",
+        compute_type: Optional[str] = None,
+        detect_model: str = DEFAULT_DETECT_MODEL,
+        batch_size: Optional[int] = None,
+        mmap_audio: bool = False
+    ):
+        self.device = device
+        self.compute_type = compute_type or default_compute_type(device)
+        self.detect_model = detect_model
+        self.batch_size = batch_size
+        self.mmap_audio = mmap_audio
+
+    def settings(self) -> Dict:
+        """Settings a client must share for this session's results to match its own."""
+        return {
+            "device": self.device,
+            "compute_type": self.compute_type,
+            "detect_model": self.detect_model,
+            "batch_size": self.batch_size
+        }
+
+    def preload(self, languages: Tuple[str, ...] = ("en", "sv")):
+        """Load the Whisper and per-language alignment models up front."""
+        get_or_load_model(self.device, self.compute_type)
+        for language in languages:
+            get_or_load_align_model(language, self.device)
+
+    def transcribe(
+        self,
+        audio_path: str,
+        output_dir: str,
+        language: Optional[str] = None,
+        diarize: bool = True,
+        output_formats: list = None,
+        auto_diarize: bool = False
+    ) -> Dict:
+        return transcribe_audio(
+            audio_path=audio_path,
+            output_dir=output_dir,
+            device=self.device,
+            language=language,
+            diarize=diarize,
+            output_formats=output_formats,
+            detect_model=self.detect_model,
+            compute_type=self.compute_type,
+            batch_size=self.batch_size,
+            mmap_audio=self.mmap_audio,
+            auto_diarize=auto_diarize
+        )
+
+
+def serve(session: WhisperXSession, socket_path: Path = SERVER_SOCKET):
+    """Answer transcription requests on a Unix socket, one at a time.
+
+    Each request is a dict of WhisperXSession.transcribe keyword arguments
+    plus the client's "settings"; the reply is transcribe_audio's result
+    dict, or a "mismatch" reply carrying the server's settings when they
+    differ from the client's. A failed request is logged and answered with
+    an error result where the client is still there; the server keeps going.
+    """
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    # Owner-only socket from the start; requests are pickled
+    old_umask = os.umask(0o177)
+    try:
+        listener = Listener(str(socket_path), family="AF_UNIX")
+    finally:
+        os.umask(old_umask)
+
+    console.print(f"🛰️ Model server listening on [green]{socket_path}[/green]")
+    with listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError as e:
+                logger.error(f"Model server failed to accept a connection: {e}")
+                continue
+            with conn:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    continue  # Client went away before sending anything
+                except Exception as e:
+                    logger.error(f"Model server got an unreadable request: {e}")
+                    continue
+                try:
+                    settings = request.pop("settings", None)
+                    if settings != session.settings():
+                        reply = {"status": "mismatch", "settings": session.settings()}
+                    else:
+                        reply = session.transcribe(**request)
+                except Exception as e:
+                    logger.error(f"Model server request failed: {e}")
+                    reply = {"status": "error", "error": str(e), "processing_time": 0.0}
+                try:
+                    conn.send(reply)
+                except OSError as e:
+                    logger.error(f"Model server could not send its reply: {e}")
+
+
+def request_transcription(
+    request: dict,
+    settings: Dict,
+    socket_path: Path = SERVER_SOCKET
+) -> Optional[Dict]:
+    """Send a request to a running model server.
+
+    Returns None, so the caller transcribes in-process, when no server is
+    listening, the server drops the connection, or the server's settings
+    (see WhisperXSession.settings) differ from ``settings``.
+    """
+    if not socket_path.exists():
+        return None
+    try:
+        conn = Client(str(socket_path), family="AF_UNIX")
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None  # Stale socket from a server that's gone
+    try:
+        with conn:
+            conn.send({**request, "settings": settings})
+            result = conn.recv()
+    except (EOFError, OSError) as e:
+        console.print(f"[yellow]⚠️ Model server dropped the request ({str(e) or type(e).__name__}), transcribing here[/yellow]")
+        return None
+    if result.get("status") == "mismatch":
+        server = ", ".join(f"{key}={value}" for key, value in result["settings"].items())
+        console.print(f"[yellow]⚠️ Model server runs with different settings ({server}), transcribing here[/yellow]")
+        return None
+    return result
 
 
 def format_time_srt(seconds: float) -> str:
@@ -659,6 +1342,112 @@ def format_time_vtt(seconds: float) -> str:
     return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
 
 
+def format_timestamps(seconds: list, decimal_marker: str = ".") -> list:
+    """Format many times as HH:MM:SS.mmm at once (use "," for SRT).
+
+    Same output as format_time_vtt/format_time_srt, with the hour/minute
+    split done in NumPy over the whole list.
+    """
+    times = np.asarray(seconds, dtype=np.float64)
+    hours = (times // 3600).astype(np.int64).tolist()
+    minutes = ((times % 3600) // 60).astype(np.int64).tolist()
+    secs = (times % 60).tolist()
+    if decimal_marker == ".":
+        return [f"{h:02d}:{m:02d}:{s:06.3f}" for h, m, s in zip(hours, minutes, secs)]
+    return [f"{h:02d}:{m:02d}:{s:06.3f}".replace(".", decimal_marker) for h, m, s in zip(hours, minutes, secs)]
+
+
+@dataclass
+class SegmentColumns:
+    """Per-segment fields every text format needs, extracted in one pass."""
+    texts: list          # stripped segment text
+    prefixes: list       # "[SPEAKER] " for txt/srt/vtt, "" without diarization
+    tsv_speakers: list   # speaker column for TSV
+    starts: list
+    ends: list
+    speakers: set        # distinct speakers found by diarization
+
+    @classmethod
+    def from_result(cls, result: dict, diarize: bool) -> "SegmentColumns":
+        texts, prefixes, tsv_speakers, starts, ends = [], [], [], [], []
+        speakers = set()
+        for segment in result["segments"]:
+            texts.append(segment['text'].strip())
+            starts.append(segment['start'])
+            ends.append(segment['end'])
+            if diarize:
+                speaker = segment.get('speaker')
+                if speaker:
+                    speakers.add(speaker)
+                speaker = speaker if 'speaker' in segment else 'UNKNOWN'
+                prefixes.append(f"[{speaker}] ")
+                tsv_speakers.append(speaker)
+            else:
+                prefixes.append("")
+                tsv_speakers.append('SPEAKER_00')
+        return cls(texts, prefixes, tsv_speakers, starts, ends, speakers)
+
+
+def write_txt(path: str, result: dict, columns: SegmentColumns):
+    """Plain transcript, one segment per line."""
+    lines = [f"{prefix}{text}\n" for prefix, text in zip(columns.prefixes, columns.texts)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def write_json(path: str, result: dict, columns: SegmentColumns):
+    """Full whisperx result including word timings."""
+    # json.dump writes many small chunks; a large buffer batches them
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+def write_srt(path: str, result: dict, columns: SegmentColumns):
+    """SubRip subtitles."""
+    starts = format_timestamps(columns.starts, ",")
+    ends = format_timestamps(columns.ends, ",")
+    lines = [
+        f"{i}\n{start} --> {end}\n{prefix}{text}\n\n"
+        for i, (start, end, prefix, text) in enumerate(zip(starts, ends, columns.prefixes, columns.texts), 1)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def write_vtt(path: str, result: dict, columns: SegmentColumns):
+    """WebVTT subtitles."""
+    starts = format_timestamps(columns.starts)
+    ends = format_timestamps(columns.ends)
+    lines = ["WEBVTT\n\n"]
+    lines += [
+        f"{start} --> {end}\n{prefix}{text}\n\n"
+        for start, end, prefix, text in zip(starts, ends, columns.prefixes, columns.texts)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def write_tsv(path: str, result: dict, columns: SegmentColumns):
+    """Tab-separated start, end, speaker and text."""
+    lines = ["start\tend\tspeaker\ttext\n"]
+    lines += [
+        f"{start:.3f}\t{end:.3f}\t{speaker}\t{text}\n"
+        for start, end, speaker, text in zip(columns.starts, columns.ends, columns.tsv_speakers, columns.texts)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+# Output format -> writer(path, result, columns)
+FORMAT_WRITERS = {
+    'txt': write_txt,
+    'json': write_json,
+    'srt': write_srt,
+    'vtt': write_vtt,
+    'tsv': write_tsv,
+}
+
+
 def main():
     # Display startup banner
     console.print()
@@ -680,28 +1469,56 @@ Examples:
   %(prog)s call.m4a --no-diarize          # Skip speaker identification
   %(prog)s audio.m4a --formats txt,srt    # TXT + SRT formats
   %(prog)s video.mp4 --all-formats         # All formats (TXT,JSON,SRT,VTT,TSV)
+  %(prog)s part1.m4a part2.m4a part3.m4a   # Several files share Whisper batches
+  %(prog)s --serve                         # Keep models loaded; later runs use this server
         """
     )
-    parser.add_argument("input", help="Input audio file path")
+    parser.add_argument("input", nargs="*", help="Input audio file path(s); several files share Whisper batches")
     parser.add_argument("-o", "--output", default="./transcripts", help="Output directory (default: ./transcripts)")
     parser.add_argument("-l", "--language", help="Language code (sv/en, auto-detected if not provided)")
     parser.add_argument("--no-diarize", action="store_true", help="Skip speaker diarization")
+    parser.add_argument("--auto-diarize", action="store_true", help="Skip diarization when the audio sounds like a single speaker (heuristic, may misjudge)")
     parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"], help="Processing device (default: cpu)")
     parser.add_argument("--formats", default="txt", help="Output formats (comma-separated): txt,json,srt,vtt,tsv (default: txt)")
+    parser.add_argument("--compute-type", choices=COMPUTE_TYPES, help="CTranslate2 compute type (default: float16 on CUDA, int8 on CPU)")
+    parser.add_argument("--batch-size", type=int, help="Transcription batch size (default: from free VRAM on CUDA, 4 on CPU)")
+    parser.add_argument("--detect-model", default=DEFAULT_DETECT_MODEL, help=f"Whisper model for language detection (default: {DEFAULT_DETECT_MODEL})")
     parser.add_argument("--all-formats", action="store_true", help="Output all formats (txt,json,srt,vtt,tsv)")
+    parser.add_argument("--mmap-audio", action="store_true", help="Keep decoded audio in a file-backed buffer to lower peak memory on long files")
+    parser.add_argument("--serve", action="store_true", help=f"Keep models loaded and serve requests on {SERVER_SOCKET}")
+    parser.add_argument("--no-server", action="store_true", help="Transcribe in this process even if a model server is running")
     
     args = parser.parse_args()
     
-    # Validate input file
-    input_path = Path(args.input)
-    if not input_path.exists():
-        console.print(f"[red]❌ Error: Input file not found: {args.input}[/red]")
-        sys.exit(1)
+    if args.serve:
+        device = args.device
+        if device == "cuda" and not torch.cuda.is_available():
+            console.print("[yellow]⚠️ CUDA not available, falling back to CPU[/yellow]")
+            device = "cpu"
+        session = WhisperXSession(device, args.compute_type, args.detect_model, args.batch_size, args.mmap_audio)
+        console.print(f"🤖 Preloading models on {device.upper()} ({session.compute_type})...")
+        session.preload()
+        try:
+            serve(session)
+        except KeyboardInterrupt:
+            console.print("\n👋 Model server stopped")
+        return
     
-    if input_path.suffix.lower() not in SUPPORTED_FORMATS:
-        console.print(f"[red]❌ Error: Unsupported format: {input_path.suffix}[/red]")
-        console.print(f"[yellow]Supported formats: {', '.join(sorted(SUPPORTED_FORMATS))}[/yellow]")
-        sys.exit(1)
+    if not args.input:
+        parser.error("the following arguments are required: input")
+    
+    # Validate input files
+    input_paths = [Path(path) for path in args.input]
+    for input_path in input_paths:
+        if not input_path.exists():
+            console.print(f"[red]❌ Error: Input file not found: {input_path}[/red]")
+            sys.exit(1)
+        
+        if input_path.suffix.lower() not in SUPPORTED_FORMATS:
+            console.print(f"[red]❌ Error: Unsupported format: {input_path.suffix}[/red]")
+            console.print(f"[yellow]Supported formats: {', '.join(sorted(SUPPORTED_FORMATS))}[/yellow]")
+            sys.exit(1)
+    input_path = input_paths[0]
     
     # Check for GPU availability
     device = args.device
@@ -724,9 +1541,13 @@ Examples:
             sys.exit(1)
     
     # Display processing info
-    console.print(f"📂 Input file: [green]{input_path}[/green]")
+    if len(input_paths) > 1:
+        console.print(f"📂 Input files: [green]{len(input_paths)}[/green] ({', '.join(path.name for path in input_paths)})")
+    else:
+        console.print(f"📂 Input file: [green]{input_path}[/green]")
     console.print(f"📁 Output directory: [green]{args.output}[/green]")
-    console.print(f"💻 Device: [blue]{device.upper()}[/blue]")
+    compute_type = args.compute_type or default_compute_type(device)
+    console.print(f"💻 Device: [blue]{device.upper()}[/blue] ({compute_type})")
     console.print(f"👥 Speaker diarization: [blue]{'Enabled' if not args.no_diarize else 'Disabled'}[/blue]")
     console.print(f"📄 Output formats: [blue]{', '.join(fmt.upper() for fmt in output_formats)}[/blue]")
     if args.language:
@@ -735,15 +1556,62 @@ Examples:
     else:
         console.print("🌍 Language: [blue]🔍 Auto-detect[/blue]")
     
+    # Several files: batch Whisper across them in this process
+    if len(input_paths) > 1:
+        results = transcribe_many(
+            [str(path) for path in input_paths],
+            output_dir=args.output,
+            device=device,
+            language=args.language,
+            diarize=not args.no_diarize,
+            output_formats=output_formats,
+            detect_model=args.detect_model,
+            compute_type=compute_type,
+            batch_size=args.batch_size,
+            mmap_audio=args.mmap_audio,
+            auto_diarize=args.auto_diarize
+        )
+        failed = [path.name for path, r in zip(input_paths, results) if r["status"] != "success"]
+        if failed:
+            console.print(f"\n[bold red]💥 {len(failed)} of {len(results)} transcriptions failed: {', '.join(failed)}[/bold red]")
+            sys.exit(1)
+        console.print(f"\n[bold green]🎉 Success! All {len(results)} transcriptions completed![/bold green]")
+        sys.exit(0)
+    
+    # Hand off to a running model server if there is one with the same settings
+    result = None
+    if not args.no_server:
+        result = request_transcription({
+            "audio_path": str(input_path.resolve()),
+            "output_dir": str(Path(args.output).resolve()),
+            "language": args.language,
+            "diarize": not args.no_diarize,
+            "output_formats": output_formats,
+            "auto_diarize": args.auto_diarize
+        }, {
+            "device": device,
+            "compute_type": compute_type,
+            "detect_model": args.detect_model,
+            "batch_size": args.batch_size
+        })
+        if result is not None:
+            console.print(f"[dim]🛰️ Transcribed by model server at {SERVER_SOCKET}[/dim]")
+    
     # Transcribe
-    result = transcribe_audio(
-        audio_path=str(input_path),
-        output_dir=args.output,
-        device=device,
-        language=args.language,
-        diarize=not args.no_diarize,
-        output_formats=output_formats
-    )
+    if result is None:
+        result = transcribe_audio(
+            audio_path=str(input_path),
+            output_dir=args.output,
+            device=device,
+            language=args.language,
+            diarize=not args.no_diarize,
+            output_formats=output_formats,
+            detect_model=args.detect_model,
+            compute_type=compute_type,
+            batch_size=args.batch_size,
+            mmap_audio=args.mmap_audio,
+            auto_diarize=args.auto_diarize
+        )
     
     if result["status"] == "success":
         console.print("\n[bold green]🎉 Success! Transcription completed successfully![/bold green]")
@@ -7,28 +7,37 @@ Provides state management and Unix socket IPC for the WhisperBar SwiftUI menu ba
 """
 
 import asyncio
+import errno
+import hashlib
+import importlib.util
+import json
 import os
+import queue
+import re
+import select
 import signal
+import struct
 import sys
 import time
+import wave
 import shutil
 import logging
 import subprocess
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Optional, Set
 import argparse
 
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import FileClosedEvent, FileCreatedEvent, FileMovedEvent, FileSystemEventHandler
 from dotenv import load_dotenv
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
+from rich.rule import Rule
 from rich.table import Table
-from rich.live import Live
-from rich.text import Text
-from rich import print as rprint
-from datetime import datetime
 import threading
+from collections import OrderedDict
 
 from daemon_state import StateManager, get_state_manager
 
@@ -64,11 +73,284 @@ def log_error(message: str):
     logger.error(message)
 
 # Supported audio formats
-SUPPORTED_FORMATS = {'.m4a', '.mp4', '.mov', '.wav', '.mp3', '.flac', '.ogg'}
+SUPPORTED_FORMATS = frozenset({'.m4a', '.mp4', '.mov', '.wav', '.mp3', '.flac', '.ogg'})
 
 # File processing cooldown (seconds)
 PROCESSING_COOLDOWN = 2
 
+# inotify reports IN_CLOSE_WRITE as watchdog's on_closed; other platforms
+# (FSEvents on macOS) don't, so they poll for a stable size instead
+CLOSE_EVENTS_AVAILABLE = sys.platform.startswith("linux")
+
+# The only events the handler acts on; the observer masks out everything else
+# (IN_ACCESS, IN_OPEN, IN_MODIFY...) in the kernel. Linux uses the close, not
+# the create, as its ready signal but still needs creates for files moved in
+WATCHED_EVENTS = [FileClosedEvent, FileCreatedEvent, FileMovedEvent] if CLOSE_EVENTS_AVAILABLE else [FileCreatedEvent, FileMovedEvent]
+
+# Stability polling: first interval, backoff cap and overall limit (seconds)
+STABLE_POLL_INITIAL = 0.2
+STABLE_POLL_MAX = 2.0
+STABLE_WAIT_MAX = 30
+
+# Longest a single transcription may run before its worker is restarted (seconds)
+TRANSCRIPTION_TIMEOUT = 7200
+
+# With --subprocess, a transcribe.py that prints nothing for this long is hung (seconds)
+TRANSCRIPTION_IDLE_TIMEOUT = 600
+
+# How many successfully processed files are remembered to ignore repeat events
+PROCESSED_FILES_MAX = 10000
+
+# Filename marker that turns diarization off, matched without lowercasing the name
+NOSPEAKERS_MARKER = re.compile(re.escape("-nospeakers"), re.IGNORECASE)
+
+# Resolved once; without it (not macOS) notifications are skipped instead of failing each file
+OSASCRIPT = shutil.which("osascript")
+FFPROBE = shutil.which("ffprobe") or "ffprobe"
+
+# For every child the watcher starts: with close_fds=False and an absolute
+# executable, subprocess uses posix_spawn (vfork-backed on glibc, a syscall
+# on macOS) instead of fork+exec. Nothing leaks, since Python opens its own
+# fds non-inheritable (PEP 446)
+SPAWN_OPTIONS = {"close_fds": False}
+
+# Message and title are passed as argv so quotes in filenames can't break the script
+NOTIFY_COMMANDS = {
+    sound: (
+        OSASCRIPT,
+        "-e", "on run argv",
+        "-e", "display notification (item 1 of argv) with title (item 2 of argv)"
+              + (' sound name "Glass"' if sound else ""),
+        "-e", "end run",
+    )
+    for sound in (True, False)
+}
+
+# Formats the watcher always asks transcribe.py for
+OUTPUT_FORMATS = ['txt', 'json', 'srt', 'vtt', 'tsv']
+
+# WhisperXSession inside the worker process, set by _init_transcription_worker
+_worker_session = None
+
+
+def _init_transcription_worker(script_path: str, cpu_share: int):
+    """Import the --script file in the worker process and load its models once.
+
+    The file is loaded from its path, so a script not named transcribe.py is
+    the one that runs. cpu_share workers run side by side, so each takes that
+    fraction of the physical cores; the script reads it before torch sizes
+    its thread pools.
+    """
+    global _worker_session
+    os.environ["WHISPERX_CPU_SHARE"] = str(cpu_share)
+    path = Path(script_path)
+    sys.path.insert(0, str(path.parent))  # For the script's own sibling imports
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    transcribe = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = transcribe
+    spec.loader.exec_module(transcribe)
+
+    _worker_session = transcribe.WhisperXSession()
+    _worker_session.preload()
+
+
+def _worker_ready() -> bool:
+    return True
+
+
+def _transcribe_in_worker(audio_path: str, output_dir: str, diarize: bool, auto_diarize: bool = False) -> dict:
+    return _worker_session.transcribe(
+        audio_path, output_dir, diarize=diarize, output_formats=OUTPUT_FORMATS, auto_diarize=auto_diarize
+    )
+
+
+def _log_emit_failure(future: Future):
+    """Log a state update that raised on the event loop; nothing else waits on it."""
+    if not future.cancelled() and future.exception() is not None:
+        log_error(f"State update failed: {future.exception()}")
+
+
+def _is_audio_name(name: str) -> bool:
+    """Whether a file name is one the watcher transcribes.
+
+    Hidden names are skipped: macOS AppleDouble files (._x.m4a) and
+    rsync/sync-client temp files share the audio suffix but aren't audio.
+    """
+    if name.startswith("."):
+        return False
+    suffix = os.path.splitext(name)[1]
+    # Only lowercase the rare uppercase suffix (e.g. iPhone's .MOV)
+    return suffix in SUPPORTED_FORMATS or suffix.lower() in SUPPORTED_FORMATS
+
+
+def _mp4_duration(f) -> Optional[float]:
+    """Duration from an MP4/M4A/MOV file's moov/mvhd box."""
+    end = os.fstat(f.fileno()).st_size
+    pos = 0
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, box = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return None
+        if box == b"moov":
+            # Descend into moov; mvhd is one of its children
+            end = pos + size
+            pos += header
+            continue
+        if box == b"mvhd":
+            version = f.read(1)[0]
+            f.read(3)
+            if version == 1:
+                timescale, duration = struct.unpack(">16xIQ", f.read(28))
+            else:
+                timescale, duration = struct.unpack(">8xII", f.read(16))
+            return duration / timescale if timescale else None
+        pos += size
+    return None
+
+
+def _flac_duration(f) -> Optional[float]:
+    """Duration from a FLAC file's STREAMINFO block (always the first one)."""
+    if f.read(4) != b"fLaC":
+        return None
+    streaminfo = f.read(4 + 34)[4:]
+    if len(streaminfo) < 18:
+        return None
+    # 20 bits sample rate, 3 channels, 5 bits per sample, 36 bits total samples
+    packed = int.from_bytes(streaminfo[10:18], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    return total_samples / sample_rate if sample_rate and total_samples else None
+
+
+def _header_duration(file_path: Path) -> Optional[float]:
+    """Read the duration straight from the container header, or None if unsure.
+
+    Covers WAV, MP4/M4A/MOV and FLAC; MP3 and OGG need a scan, so they're
+    left to ffprobe.
+    """
+    suffix = file_path.suffix.lower()
+    try:
+        if suffix == ".wav":
+            with wave.open(str(file_path)) as w:
+                return w.getnframes() / w.getframerate()
+        with open(file_path, "rb") as f:
+            if suffix in (".m4a", ".mp4", ".mov"):
+                return _mp4_duration(f)
+            if suffix == ".flac":
+                return _flac_duration(f)
+    except (OSError, EOFError, struct.error, wave.Error, ZeroDivisionError, IndexError):
+        return None
+    return None
+
+
+def _move_no_replace(src: Path, dst: Path) -> bool:
+    """Move src to dst unless dst already exists; False if the name is taken.
+
+    A hard link claims the name atomically (EEXIST if taken) and, like a
+    rename, is a metadata-only operation on the same filesystem.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        return False
+    except OSError:
+        # No hard links here (EXDEV, or a filesystem like exFAT without them)
+        if dst.exists():
+            return False
+        try:
+            os.rename(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(str(src), str(dst))
+        return True
+    os.unlink(src)
+    return True
+
+
+class TranscriptionWorker:
+    """Long-lived processes that keep the WhisperX models loaded between files.
+
+    Each of the `processes` slots is its own single-process pool, so a crash
+    or timeout only takes down that slot's process; it's replaced on the slot's
+    next file and files running in the other slots carry on.
+    """
+
+    def __init__(self, script_path: Path, processes: int = 1):
+        self.script_path = str(script_path)
+        self.processes = processes
+        self._pools: list = [None] * processes
+        self._lock = threading.Lock()
+        # Slots not running a file; the handler never runs more files than slots
+        self._free_slots: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        for slot in range(processes):
+            self._free_slots.put(slot)
+
+    def _get_pool(self, slot: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pools[slot] is None:
+                self._pools[slot] = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_transcription_worker,
+                    initargs=(self.script_path, self.processes),
+                )
+            return self._pools[slot]
+
+    def start(self):
+        """Start the workers and begin loading models without waiting for them."""
+        for slot in range(self.processes):
+            self._get_pool(slot).submit(_worker_ready)
+
+    def transcribe(
+        self,
+        audio_path: Path,
+        output_dir: Path,
+        diarize: bool,
+        auto_diarize: bool = False,
+        timeout: float = TRANSCRIPTION_TIMEOUT,
+    ) -> dict:
+        slot = self._free_slots.get()
+        try:
+            future = self._get_pool(slot).submit(
+                _transcribe_in_worker, str(audio_path), str(output_dir), diarize, auto_diarize
+            )
+            try:
+                return future.result(timeout=timeout)
+            except (FutureTimeoutError, BrokenProcessPool):
+                self._kill_slot(slot)
+                raise
+        finally:
+            self._free_slots.put(slot)
+
+    def _kill_slot(self, slot: int):
+        with self._lock:
+            pool, self._pools[slot] = self._pools[slot], None
+        if pool is not None:
+            # A hung worker never finishes its task, so kill it rather than wait
+            for process in list(getattr(pool, "_processes", {}).values()):
+                process.kill()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def kill(self):
+        """Kill every worker process; the next transcription starts fresh ones."""
+        for slot in range(self.processes):
+            self._kill_slot(slot)
+
+    def shutdown(self):
+        with self._lock:
+            pools, self._pools = self._pools, [None] * self.processes
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
 
 class TranscriptionHandler(FileSystemEventHandler):
     """Handles file system events for automatic transcription."""
@@ -81,23 +363,35 @@ class TranscriptionHandler(FileSystemEventHandler):
         script_path: str,
         state_manager: Optional[StateManager] = None,
         event_loop: Optional[asyncio.AbstractEventLoop] = None,
+        use_subprocess: bool = False,
+        workers: int = 1,
+        auto_diarize: bool = False,
     ):
         self.incoming_dir = Path(incoming_dir)
         self.transcripts_dir = Path(transcripts_dir)
         self.archive_dir = Path(archive_dir)
         self.script_path = Path(script_path)
+        self.use_subprocess = use_subprocess
+        self.auto_diarize = auto_diarize
+        self.worker = None if use_subprocess else TranscriptionWorker(self.script_path, processes=workers)
+        # Files run here so watchdog's dispatch thread only queues them
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe")
         self.state_manager = state_manager
         self.event_loop = event_loop
         self.processing_files: Set[str] = set()
-        self.processed_files: Set[str] = set()
+        # (path, mtime_ns) of finished files, so a new recording under a reused
+        # name still gets processed; insertion-ordered to drop the oldest
+        self.processed_files: "OrderedDict[tuple, None]" = OrderedDict()
         self.stats = {
             'total_processed': 0,
             'successful': 0,
             'failed': 0,
-            'start_time': datetime.now(),
+            'start_ns': time.monotonic_ns(),
             'current_file': None,
             'last_processed': None
         }
+        # Guards the file sets and the counter increments (several workers write them)
         self.lock = threading.Lock()
 
         # Create directories if they don't exist
@@ -115,9 +409,23 @@ class TranscriptionHandler(FileSystemEventHandler):
         ))
 
     def _emit_event(self, coro):
-        """Run an async coroutine from sync context."""
+        """Run an async coroutine from sync context without waiting for it.
+
+        State changes then happen one at a time on the event loop, in the
+        order they were emitted, however many workers emit them.
+        """
         if self.state_manager and self.event_loop:
-            asyncio.run_coroutine_threadsafe(coro, self.event_loop)
+            future = asyncio.run_coroutine_threadsafe(coro, self.event_loop)
+            future.add_done_callback(_log_emit_failure)
+        else:
+            coro.close()
+    
+    def dispatch(self, event):
+        """Drop events for unsupported files before any per-event work."""
+        path = getattr(event, "dest_path", "") or event.src_path
+        if not _is_audio_name(os.path.basename(path)):
+            return
+        super().dispatch(event)
     
     def on_created(self, event):
         """Handle file creation events."""
@@ -125,22 +433,43 @@ class TranscriptionHandler(FileSystemEventHandler):
             return
             
         file_path = Path(event.src_path)
-        self._process_file(file_path)
+        if CLOSE_EVENTS_AVAILABLE:
+            # A new, still-empty file: its writer's close (on_closed) is the ready
+            # signal. inotify also reports files moved in from outside the
+            # folder as created; those arrive with their content already there.
+            try:
+                if file_path.stat().st_size == 0:
+                    return
+            except OSError:
+                return
+        self._submit(file_path)
+    
+    def on_closed(self, event):
+        """Handle a writer closing a file (inotify IN_CLOSE_WRITE): it's complete."""
+        if event.is_directory:
+            return
+            
+        file_path = Path(event.src_path)
+        self._submit(file_path, wait_stable=False)
     
     def on_moved(self, event):
         """Handle file move events (e.g., when a file is moved into the folder)."""
         if event.is_directory:
             return
             
+        # A rename is atomic, so with close events the file is already complete
         file_path = Path(event.dest_path)
-        self._process_file(file_path)
+        self._submit(file_path, wait_stable=not CLOSE_EVENTS_AVAILABLE)
     
     def _get_audio_duration(self, file_path: Path) -> float:
-        """Get audio duration in seconds using ffprobe."""
+        """Get audio duration in seconds from the file header, else using ffprobe."""
+        duration = _header_duration(file_path)
+        if duration is not None:
+            return duration
         try:
             result = subprocess.run(
                 [
-                    "ffprobe",
+                    FFPROBE,
                     "-v", "error",
                     "-show_entries", "format=duration",
                     "-of", "default=noprint_wrappers=1:nokey=1",
@@ -149,38 +478,54 @@ class TranscriptionHandler(FileSystemEventHandler):
                 capture_output=True,
                 text=True,
                 timeout=30,
+                **SPAWN_OPTIONS,
             )
             return float(result.stdout.strip())
         except (subprocess.TimeoutExpired, ValueError, FileNotFoundError):
             return 0.0
 
-    def _process_file(self, file_path: Path):
-        """Process a single audio file."""
+    def _submit(self, file_path: Path, wait_stable: bool = True) -> Optional[Future]:
+        """Claim a new audio file and queue it on the transcription pool."""
+        # Check if it's a supported audio format
+        if not _is_audio_name(file_path.name):
+            return None
+
+        # Late events for a file that's already been archived find nothing here
         try:
-            # Check if it's a supported audio format
-            if file_path.suffix.lower() not in SUPPORTED_FORMATS:
-                return
+            mtime_ns = file_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
 
-            # Check if file is already being processed or was processed
-            file_key = str(file_path)
-            if file_key in self.processing_files or file_key in self.processed_files:
-                return
+        # Check if file is already being processed or was processed; claim it atomically
+        file_key = str(file_path)
+        with self.lock:
+            if file_key in self.processing_files or (file_key, mtime_ns) in self.processed_files:
+                return None
+            self.processing_files.add(file_key)
+        return self.pool.submit(self._process_file, file_path, wait_stable)
 
+    def _process_file(self, file_path: Path, wait_stable: bool = True):
+        """Process a single audio file claimed by _submit."""
+        file_key = str(file_path)
+        try:
             # Wait for file to be completely written (avoid processing partial files)
-            console.print(f"🔍 Detected new file: [cyan]{file_path.name}[/cyan]")
-            console.print("⏳ Waiting for file to be completely written...")
-            self._wait_for_file_stable(file_path)
+            detected = f"🔍 Detected new file: [cyan]{file_path.name}[/cyan]"
+            if wait_stable:
+                console.print(Group(detected, "⏳ Waiting for file to be completely written..."))
+                self._wait_for_file_stable(file_path)
+            else:
+                console.print(detected)
 
-            if not file_path.exists():
+            try:
+                mtime_ns = file_path.stat().st_mtime_ns
+            except FileNotFoundError:
                 console.print(f"[yellow]⚠️ File disappeared during processing: {file_path}[/yellow]")
                 return
 
-            # Mark as processing
-            self.processing_files.add(file_key)
             log_info(f"Starting transcription: {file_path.name}")
 
-            with self.lock:
-                self.stats['current_file'] = file_path.name
+            # A single item store; readers snapshot the dict without the lock
+            self.stats['current_file'] = file_path.name
 
             # Get audio duration for state manager
             duration = self._get_audio_duration(file_path)
@@ -188,8 +533,7 @@ class TranscriptionHandler(FileSystemEventHandler):
                 log_info(f"Audio duration: {duration:.1f}s")
 
             # Display processing start
-            console.print()
-            console.rule(f"[bold green]🎙️ Processing: {file_path.name}")
+            console.print(Group("", Rule(f"[bold green]🎙️ Processing: {file_path.name}")))
 
             # Send start notification
             self._send_notification(
@@ -200,12 +544,12 @@ class TranscriptionHandler(FileSystemEventHandler):
 
             # Update state to transcribing
             if self.state_manager:
-                self.state_manager.set_transcribing_sync(file_path.name, duration)
+                self._emit_event(self.state_manager.on_transcription_start(file_path.name, duration))
 
             # Run transcription
-            start_time = time.time()
+            start_time = time.monotonic()
             success, result_info = self._run_transcription(file_path)
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
 
             # Update stats
             with self.lock:
@@ -226,50 +570,50 @@ class TranscriptionHandler(FileSystemEventHandler):
                     # Delete instead of archive - file exists elsewhere
                     file_path.unlink()
                     noarchive_marker.unlink()
-                    console.print(f"🗑️  Deleted (original exists elsewhere): [dim]{file_path.name}[/dim]")
+                    archived = "[dim]deleted (original exists elsewhere)[/dim]"
+                    summary = [f"🗑️  Deleted (original exists elsewhere): [dim]{file_path.name}[/dim]"]
                     log_info(f"Deleted (no archive): {file_path.name}")
                 else:
                     # Move to archive
-                    archive_path = self.archive_dir / file_path.name
-                    counter = 1
-                    while archive_path.exists():
-                        name_parts = file_path.stem, counter, file_path.suffix
-                        archive_path = self.archive_dir / f"{name_parts[0]}_{name_parts[1]}{name_parts[2]}"
-                        counter += 1
-
-                    shutil.move(str(file_path), str(archive_path))
-                    console.print(f"📦 Moved to archive: [green]{archive_path.name}[/green]")
+                    archive_path = self._archive(file_path)
+
+                    archived = archive_path.name
+                    summary = [f"📦 Moved to archive: [green]{archive_path.name}[/green]"]
                     log_info(f"Archived to: {archive_path.name}")
 
                 # Mark as processed
-                self.processed_files.add(file_key)
+                with self.lock:
+                    self.processed_files[(file_key, mtime_ns)] = None
+                    if len(self.processed_files) > PROCESSED_FILES_MAX:
+                        self.processed_files.popitem(last=False)
 
                 # Update state to completed
                 transcript_path = self.transcripts_dir / f"{file_path.stem}.txt"
                 if self.state_manager:
-                    self.state_manager.set_completed_sync(
+                    self._emit_event(self.state_manager.on_transcription_complete(
                         filename=file_path.name,
                         transcript_path=str(transcript_path),
                         duration_seconds=duration,
                         language=result_info.get("language", "unknown"),
                         speaker_count=result_info.get("speaker_count", 0),
-                    )
+                    ))
 
-                # Display success summary
-                console.print(Panel(
+                # Display success summary with the archive line, in one write
+                summary.append(Panel(
                     f"[bold green]✅ Successfully processed[/bold green]\n"
                     f"[cyan]File:[/cyan] {file_path.name}\n"
                     f"[cyan]Time:[/cyan] {processing_time:.1f}s\n"
-                    f"[cyan]Archive:[/cyan] {archive_path.name}",
+                    f"[cyan]Archive:[/cyan] {archived}",
                     title="🎉 Success",
                     border_style="green"
                 ))
+                console.print(Group(*summary))
             else:
                 # Update state to failed
                 error_msg = result_info.get("error", "Unknown error")
                 log_error(f"Transcription failed: {file_path.name} - {error_msg}")
                 if self.state_manager:
-                    self.state_manager.set_failed_sync(file_path.name, error_msg)
+                    self._emit_event(self.state_manager.on_transcription_failed(file_path.name, error_msg))
 
                 console.print(Panel(
                     f"[bold red]❌ Processing failed[/bold red]\n"
@@ -279,45 +623,132 @@ class TranscriptionHandler(FileSystemEventHandler):
                     border_style="red"
                 ))
 
-            # Remove from processing set
-            self.processing_files.discard(file_key)
-
         except Exception as e:
             console.print(f"[red]💥 Unexpected error processing {file_path.name}: {e}[/red]")
             log_error(f"Unexpected error processing {file_path.name}: {e}")
             if self.state_manager:
-                self.state_manager.set_failed_sync(file_path.name, str(e))
-            self.processing_files.discard(str(file_path))
+                self._emit_event(self.state_manager.on_transcription_failed(file_path.name, str(e)))
+        finally:
+            # Remove from processing set
+            with self.lock:
+                self.processing_files.discard(file_key)
     
-    def _wait_for_file_stable(self, file_path: Path, max_wait: int = 30):
-        """Wait for file to be completely written by checking size stability."""
-        last_size = -1
+    def _archive(self, file_path: Path) -> Path:
+        """Move a finished file into the archive and return its new path.
+
+        A taken name gets a short hash of the file's size and mtime, so
+        repeated recorder names (VN890001.m4a...) land in one attempt and
+        the same recording always maps to the same archive name.
+        """
+        archive_path = self.archive_dir / file_path.name
+        if _move_no_replace(file_path, archive_path):
+            return archive_path
+
+        st = file_path.stat()
+        digest = hashlib.blake2b(f"{st.st_size}-{st.st_mtime_ns}".encode(), digest_size=4).hexdigest()
+        archive_path = self.archive_dir / f"{file_path.stem}_{digest}{file_path.suffix}"
+        counter = 1
+        # Same size and mtime: almost certainly the same recording again, keep both anyway
+        while not _move_no_replace(file_path, archive_path):
+            archive_path = self.archive_dir / f"{file_path.stem}_{digest}_{counter}{file_path.suffix}"
+            counter += 1
+        return archive_path
+
+    def _wait_for_file_stable(self, file_path: Path, max_wait: float = STABLE_WAIT_MAX):
+        """Wait for file to be completely written by checking size stability.
+        
+        Fallback for when no close event arrives. Polls with exponential
+        backoff and returns once two successive (size, mtime) stats match.
+        """
+        last_stat = None
         stable_count = 0
+        interval = STABLE_POLL_INITIAL
+        deadline = time.monotonic() + max_wait
         
-        for _ in range(max_wait):
+        while time.monotonic() < deadline:
             try:
-                current_size = file_path.stat().st_size
-                if current_size == last_size and current_size > 0:
+                st = file_path.stat()
+                current_stat = (st.st_size, st.st_mtime_ns)
+                if current_stat == last_stat and st.st_size > 0:
                     stable_count += 1
-                    if stable_count >= 3:  # File size stable for 3 seconds
+                    if stable_count >= 2:
                         break
                 else:
                     stable_count = 0
-                
-                last_size = current_size
-                time.sleep(1)
-                
-            except (OSError, FileNotFoundError):
-                time.sleep(1)
-                continue
+                last_stat = current_stat
+            except OSError:
+                pass
+            
+            time.sleep(interval)
+            interval = min(interval * 2, STABLE_POLL_MAX)
     
+    def _read_transcript_info(self, file_path: Path) -> dict:
+        """Language and speaker count from the JSON transcript, or {} if unavailable."""
+        json_path = self.transcripts_dir / "formats" / f"{file_path.stem}.json"
+        try:
+            data = json.loads(json_path.read_bytes())
+        except (json.JSONDecodeError, OSError):
+            return {}
+        return {
+            "language": data.get("language", "unknown"),
+            "speaker_count": len({s for seg in data.get("segments", ()) if (s := seg.get("speaker"))}),
+        }
+
     def _run_transcription(self, file_path: Path) -> tuple[bool, dict]:
-        """Run the transcription script on the file.
+        """Transcribe the file in the persistent worker process.
 
         Returns:
             Tuple of (success, result_info) where result_info contains
             language, speaker_count, and optionally error message.
         """
+        if self.use_subprocess:
+            return self._run_transcription_subprocess(file_path)
+
+        result_info = {"language": "unknown", "speaker_count": 0}
+        # Check if filename contains "-nospeakers" to skip diarization
+        diarize = NOSPEAKERS_MARKER.search(file_path.stem) is None
+        if not diarize:
+            console.print("👤 Detected '-nospeakers' in filename - skipping speaker diarization")
+
+        try:
+            result = self.worker.transcribe(file_path, self.transcripts_dir, diarize, self.auto_diarize)
+        except FutureTimeoutError:
+            logger.error(f"Transcription timeout: {file_path.name}")
+            self._send_notification(
+                f"Transcription Timeout: {file_path.stem}",
+                f"Processing took too long",
+                sound=True
+            )
+            result_info["error"] = "Timeout after 2 hours"
+            return False, result_info
+        except BrokenProcessPool:
+            console.print("[red]❌ Transcription worker crashed - it will be restarted for the next file[/red]")
+            self._send_notification(
+                f"Transcription Failed: {file_path.stem}",
+                "Transcription worker crashed",
+                sound=True
+            )
+            result_info["error"] = "Transcription worker crashed"
+            return False, result_info
+        except Exception as e:
+            logger.error(f"Error running transcription: {e}")
+            result_info["error"] = str(e)
+            return False, result_info
+
+        if result["status"] != "success":
+            result_info["error"] = result.get("error", "Unknown error")
+            return False, result_info
+
+        result_info["language"] = result.get("language", "unknown")
+        if "speaker_count" in result:
+            result_info["speaker_count"] = result["speaker_count"]
+        else:
+            # A --script transcribe.py too old to report it
+            result_info["speaker_count"] = self._read_transcript_info(file_path).get("speaker_count", 0)
+        return True, result_info
+
+    def _run_transcription_subprocess(self, file_path: Path) -> tuple[bool, dict]:
+        """Run the transcription script on the file in a fresh process."""
         result_info = {"language": "unknown", "speaker_count": 0}
         try:
             cmd = [
@@ -329,58 +760,44 @@ class TranscriptionHandler(FileSystemEventHandler):
             ]
 
             # Check if filename contains "-nospeakers" to skip diarization
-            if "-nospeakers" in file_path.stem.lower():
+            if NOSPEAKERS_MARKER.search(file_path.stem):
                 cmd.append("--no-diarize")
                 console.print("👤 Detected '-nospeakers' in filename - skipping speaker diarization")
+            elif self.auto_diarize:
+                cmd.append("--auto-diarize")
 
             console.print(f"🚀 Running: [dim]{' '.join(cmd)}[/dim]")
             console.print()  # Add some spacing before transcribe.py output
 
-            # Run transcription with timeout (let transcribe.py handle all progress display)
-            result = subprocess.run(
-                cmd,
-                timeout=7200,  # 2 hour timeout for large files
-                capture_output=False,
-            )
+            returncode = self._stream_process(cmd)
 
-            if result.returncode == 0:
-                # Try to parse result info from the JSON output if available
-                json_path = self.transcripts_dir / "formats" / f"{file_path.stem}.json"
-                if json_path.exists():
-                    try:
-                        import json
-                        with open(json_path) as f:
-                            data = json.load(f)
-                        result_info["language"] = data.get("language", "unknown")
-                        # Count unique speakers
-                        speakers = set()
-                        for seg in data.get("segments", []):
-                            if seg.get("speaker"):
-                                speakers.add(seg["speaker"])
-                        result_info["speaker_count"] = len(speakers)
-                    except (json.JSONDecodeError, OSError):
-                        pass
+            if returncode == 0:
+                # The child's only report is its JSON output
+                result_info.update(self._read_transcript_info(file_path))
                 return True, result_info
             else:
-                console.print(f"[red]❌ Transcription process failed with exit code {result.returncode}[/red]")
+                console.print(f"[red]❌ Transcription process failed with exit code {returncode}[/red]")
 
                 # Send error notification
                 self._send_notification(
                     f"Transcription Failed: {file_path.stem}",
-                    f"Process failed with exit code {result.returncode}",
+                    f"Process failed with exit code {returncode}",
                     sound=True
                 )
-                result_info["error"] = f"Exit code {result.returncode}"
+                result_info["error"] = f"Exit code {returncode}"
                 return False, result_info
 
-        except subprocess.TimeoutExpired:
+        except subprocess.TimeoutExpired as e:
             logger.error(f"Transcription timeout: {file_path.name}")
             self._send_notification(
                 f"Transcription Timeout: {file_path.stem}",
                 f"Processing took too long",
                 sound=True
             )
-            result_info["error"] = "Timeout after 2 hours"
+            if e.timeout == TRANSCRIPTION_TIMEOUT:
+                result_info["error"] = "Timeout after 2 hours"
+            else:
+                result_info["error"] = f"No output for {e.timeout / 60:.0f} minutes"
             return False, result_info
 
         except Exception as e:
@@ -388,25 +805,77 @@ class TranscriptionHandler(FileSystemEventHandler):
             result_info["error"] = str(e)
             return False, result_info
     
+    def _stream_process(self, cmd: list) -> int:
+        """Run cmd, forwarding its output live, and return its exit code.
+
+        Raises subprocess.TimeoutExpired (after killing the child) when it
+        goes TRANSCRIPTION_IDLE_TIMEOUT without printing anything, or runs
+        past TRANSCRIPTION_TIMEOUT overall.
+        """
+        # FORCE_COLOR keeps transcribe.py's rich progress bars live through the pipe;
+        # WHISPERX_CPU_SHARE splits the cores between concurrent --workers children
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, "FORCE_COLOR": "1", "WHISPERX_CPU_SHARE": str(self.workers)},
+            **SPAWN_OPTIONS,
+        )
+        fd = proc.stdout.fileno()
+        started = last_output = time.monotonic()
+        try:
+            while True:
+                ready, _, _ = select.select([fd], [], [], 5)
+                now = time.monotonic()
+                if ready:
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        break
+                    # Raw bytes, so rich's cursor control codes pass through untouched
+                    sys.stdout.buffer.write(chunk)
+                    sys.stdout.flush()
+                    last_output = now
+                if now - started > TRANSCRIPTION_TIMEOUT:
+                    raise subprocess.TimeoutExpired(cmd, TRANSCRIPTION_TIMEOUT)
+                if now - last_output > TRANSCRIPTION_IDLE_TIMEOUT:
+                    raise subprocess.TimeoutExpired(cmd, TRANSCRIPTION_IDLE_TIMEOUT)
+            return proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+            proc.stdout.close()
+
     def _send_notification(self, title: str, message: str, sound: bool = True):
         """Send macOS notification."""
+        if OSASCRIPT is None:
+            return
         try:
-            sound_param = "with sound name \"Glass\"" if sound else ""
-            script = f'''
-            display notification "{message}" with title "{title}" {sound_param}
-            '''
-            subprocess.run(['osascript', '-e', script], check=True, capture_output=True)
-        except subprocess.CalledProcessError as e:
+            # Fire and forget; subprocess reaps finished children on the next Popen.
+            # No start_new_session: it would rule out posix_spawn
+            subprocess.Popen(
+                [*NOTIFY_COMMANDS[sound], message, title],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                **SPAWN_OPTIONS,
+            )
+        except OSError as e:
             logger.error(f"Failed to send notification: {e}")
     
     def get_stats_table(self) -> Table:
         """Create a stats table for live display."""
-        with self.lock:
-            stats = self.stats.copy()
+        # dict.copy() is atomic under the GIL; counters are only ever swapped whole
+        stats = self.stats.copy()
         
         # Calculate uptime
-        uptime = datetime.now() - stats['start_time']
-        uptime_str = f"{uptime.seconds//3600}h {(uptime.seconds//60)%60}m {uptime.seconds%60}s"
+        # Monotonic, so clock changes don't skew it; hours keep counting past a day
+        minutes, seconds = divmod((time.monotonic_ns() - stats['start_ns']) // 1_000_000_000, 60)
+        hours, minutes = divmod(minutes, 60)
+        uptime_str = f"{hours}h {minutes}m {seconds}s"
         
         # Calculate success rate
         success_rate = (stats['successful'] / stats['total_processed'] * 100) if stats['total_processed'] > 0 else 0
@@ -428,22 +897,29 @@ class TranscriptionHandler(FileSystemEventHandler):
         
         return table
 
-    def process_existing_files(self):
-        """Process any existing files in the incoming directory."""
+    def process_existing_files(self, wait_for_completion: bool = False):
+        """Queue any existing files in the incoming directory, optionally waiting for them."""
         console.print("🔍 Checking for existing files...")
         
         if not self.incoming_dir.exists():
             console.print(f"[yellow]⚠️ Incoming directory does not exist: {self.incoming_dir}[/yellow]")
             return
         
-        existing_files = [f for f in self.incoming_dir.iterdir() 
-                         if f.is_file() and f.suffix.lower() in SUPPORTED_FORMATS]
+        # scandir's is_file() uses the entry's d_type, so no stat per file
+        with os.scandir(self.incoming_dir) as entries:
+            existing_files = [Path(entry.path) for entry in entries
+                              if _is_audio_name(entry.name) and entry.is_file(follow_symlinks=False)]
         
         if existing_files:
             console.print(f"📂 Found {len(existing_files)} existing files to process")
+            futures = []
             for file_path in existing_files:
                 console.print(f"  • [cyan]{file_path.name}[/cyan]")
-                self._process_file(file_path)
+                future = self._submit(file_path)
+                if future is not None:
+                    futures.append(future)
+            if wait_for_completion:
+                wait(futures)
         else:
             console.print("✨ No existing files found - ready for new uploads!")
 
@@ -484,6 +960,7 @@ async def run_daemon(args):
     config_table.add_row("📁 Transcripts", str(transcripts_dir))
     config_table.add_row("📦 Archive", str(archive_dir))
     config_table.add_row("🐍 Script", str(script_path))
+    config_table.add_row("👷 Workers", str(args.workers))
     config_table.add_row("🔌 Socket", str(state_manager.socket_path))
     config_table.add_row("🎵 Supported Formats", ", ".join(sorted(SUPPORTED_FORMATS)))
 
@@ -500,21 +977,33 @@ async def run_daemon(args):
         str(script_path),
         state_manager=state_manager,
         event_loop=loop,
+        use_subprocess=args.subprocess,
+        workers=args.workers,
+        auto_diarize=args.auto_diarize,
     )
+    if handler.worker is not None:
+        # Load models in the background while existing files are checked
+        handler.worker.start()
 
-    # Always process existing files on startup
-    handler.process_existing_files()
+    # Always process existing files on startup; --once waits for them before exiting,
+    # off the loop so state updates and WhisperBar clients are still served meanwhile
+    await loop.run_in_executor(None, handler.process_existing_files, args.once)
 
     if args.once:
         console.print()
         console.print("[bold green]✅ One-time processing complete![/bold green]")
+        handler.pool.shutdown(wait=True)
+        if handler.worker is not None:
+            handler.worker.shutdown()
         await state_manager.stop_server()
         state_manager.cleanup_pid()
         return
 
-    # Set up file watcher
+    # Set up file watcher; imported here since --once never needs it (FSEvents pulls in pyobjc on macOS)
+    from watchdog.observers import Observer
+
     observer = Observer()
-    observer.schedule(handler, str(incoming_dir), recursive=False)
+    observer.schedule(handler, str(incoming_dir), recursive=False, event_filter=WATCHED_EVENTS)
     observer.start()
 
     console.print()
@@ -545,6 +1034,10 @@ async def run_daemon(args):
     finally:
         observer.stop()
         observer.join()
+        handler.pool.shutdown(wait=False, cancel_futures=True)
+        if handler.worker is not None:
+            # Don't wait for a transcription in progress
+            handler.worker.kill()
         await state_manager.stop_server()
         state_manager.cleanup_pid()
 
@@ -556,15 +1049,6 @@ async def run_daemon(args):
 
 
 def main():
-    # Display startup banner
-    console.print()
-    console.print(Panel(
-        "[bold blue]👀 WhisperX Daemon[/bold blue]\n"
-        "[dim]Automatic transcription with menu bar app support[/dim]",
-        title="🚀 Starting",
-        border_style="blue"
-    ))
-
     parser = argparse.ArgumentParser(
         description="WhisperX daemon - watches for audio files and provides status to menu bar app",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -596,6 +1080,22 @@ Examples:
         default="./transcribe.py",
         help="Path to transcription script (default: ./transcribe.py)"
     )
+    parser.add_argument(
+        "--subprocess",
+        action="store_true",
+        help="Run transcribe.py as a new process per file instead of a persistent worker (reloads models every file)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Files to transcribe at once; each one loads its own models (default: 1)"
+    )
+    parser.add_argument(
+        "--auto-diarize",
+        action="store_true",
+        help="Skip diarization for files that sound like a single speaker (heuristic; -nospeakers in a filename always skips)"
+    )
     parser.add_argument(
         "--process-existing",
         action="store_true",
@@ -609,6 +1109,15 @@ Examples:
 
     args = parser.parse_args()
 
+    # Display startup banner (after parsing, so --help doesn't print it)
+    console.print()
+    console.print(Panel(
+        "[bold blue]👀 WhisperX Daemon[/bold blue]\n"
+        "[dim]Automatic transcription with menu bar app support[/dim]",
+        title="🚀 Starting",
+        border_style="blue"
+    ))
+
     # Run async daemon
     asyncio.run(run_daemon(args))
 